@@ -1,53 +1,23 @@
 import heapq
 import itertools
+import os
+import sys
+
+# The packed board encoding is shared with the root-level 8-puzzle solvers
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from puzzle8 import GOAL_CODE, manhattan, neighbors_h, pack, unpack
 
 # The goal state for the 8-puzzle
 GOAL_STATE = ((1, 2, 3), (4, 5, 6), (7, 8, 0))
 
-def calculate_manhattan_distance(board):
-    """
-    Calculates the Manhattan distance heuristic for a given board state.
-    The distance is the sum of the Manhattan distances of each tile
-    from its goal position.
-    """
-    distance = 0
-    for r in range(3):
-        for c in range(3):
-            value = board[r][c]
-            if value != 0:
-                # Goal position for the value
-                goal_r, goal_c = (value - 1) // 3, (value - 1) % 3
-                distance += abs(r - goal_r) + abs(c - goal_c)
-    return distance
-
-def find_empty_tile(board):
-    """Finds the (row, col) of the empty tile (0)."""
-    for r, row in enumerate(board):
-        for c, value in enumerate(row):
-            if value == 0:
-                return r, c
-    return None # Should not happen on a valid board
-
-def get_neighbors(board):
-    """Generates all valid neighbor states from the current state."""
-    neighbors = []
-    empty_r, empty_c = find_empty_tile(board)
-
-    # Possible moves: Up, Down, Left, Right
-    for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-        new_r, new_c = empty_r + dr, empty_c + dc
-
-        if 0 <= new_r < 3 and 0 <= new_c < 3:
-            # Create a mutable copy to perform the swap
-            new_board_list = [list(row) for row in board]
-            new_board_list[empty_r][empty_c], new_board_list[new_r][new_c] = \
-                new_board_list[new_r][new_c], new_board_list[empty_r][empty_c]
-            
-            # Convert back to a tuple of tuples to be hashable
-            new_board = tuple(tuple(row) for row in new_board_list)
-            neighbors.append(new_board)
-            
-    return neighbors
+def pack_board(board):
+    """Packs a 3x3 board (rows of tiles) into the shared int encoding."""
+    return pack(tuple(itertools.chain(*board)))
+
+def unpack_board(code):
+    """Inverse of pack_board: returns the board as a tuple of row tuples."""
+    flat = unpack(code)
+    return tuple(flat[r:r + 3] for r in range(0, 9, 3))
 
 def is_solvable(board):
     """
@@ -64,10 +34,18 @@ def is_solvable(board):
                 inversions += 1
     return inversions % 2 == 0
 
-def solve_puzzle(initial_board):
+def solve_puzzle(initial_board, stats=None, weight=None):
     """
     Solves the 8-puzzle using Greedy Best-First Search.
-    The priority queue stores tuples of (heuristic, board_state, path).
+    The priority queue stores tuples of (priority, insertion_counter, board_state, heuristic);
+    paths are rebuilt at the end from parent pointers.
+    With weight=None the priority is the heuristic alone (pure greedy). With a
+    weight w the priority is f = g + w*h (weighted A*): w=1 is A* and returns an
+    optimal path, and w>1 trades quality for speed with a path at most w times
+    longer than optimal.
+    stats is an optional search-statistics object (see search_stats.py at the
+    repository root); solve_puzzle calls stats.expand(depth, generated, frontier)
+    once per expanded board.
     """
     # Convert initial board to tuple of tuples to be hashable
     initial_board = tuple(tuple(row) for row in initial_board)
@@ -76,30 +54,47 @@ def solve_puzzle(initial_board):
         print("The initial configuration is not solvable.")
         return None
 
-    # Priority queue: (heuristic_cost, current_board, path_to_current)
+    # Boards are packed as ints; the counter breaks priority ties in insertion order
+    # so the heap never has to compare boards
+    counter = itertools.count()
     priority_queue = []
-    initial_h = calculate_manhattan_distance(initial_board)
-    heapq.heappush(priority_queue, (initial_h, initial_board, [initial_board]))
-
-    # A set to keep track of visited states to avoid cycles
+    initial_code = pack_board(initial_board)
+    initial_h = manhattan(initial_code)
+    initial_priority = initial_h if weight is None else weight * initial_h
+    heapq.heappush(priority_queue, (initial_priority, next(counter), initial_code, initial_h))
+
+    # Cheapest known number of moves to each board and the board it was reached from
+    cost = {initial_code: 0}
+    parent = {initial_code: None}
+    # A set to keep track of expanded states to avoid cycles
     visited = set()
 
     while priority_queue:
-        h, current_board, path = heapq.heappop(priority_queue)
+        _, _, current_board, h = heapq.heappop(priority_queue)
 
-        if current_board == GOAL_STATE:
-            return path
+        if current_board == GOAL_CODE:
+            path = []
+            while current_board is not None:
+                path.append(unpack_board(current_board))
+                current_board = parent[current_board]
+            return path[::-1]
 
         if current_board in visited:
             continue
 
         visited.add(current_board)
 
-        for neighbor in get_neighbors(current_board):
-            if neighbor not in visited:
-                neighbor_h = calculate_manhattan_distance(neighbor)
-                new_path = path + [neighbor]
-                heapq.heappush(priority_queue, (neighbor_h, neighbor, new_path))
+        new_cost = cost[current_board] + 1
+        children = neighbors_h(current_board, h)
+        for neighbor, neighbor_h in children:
+            if neighbor in visited or new_cost >= cost.get(neighbor, new_cost + 1):
+                continue
+            cost[neighbor] = new_cost
+            parent[neighbor] = current_board
+            priority = neighbor_h if weight is None else new_cost + weight * neighbor_h
+            heapq.heappush(priority_queue, (priority, next(counter), neighbor, neighbor_h))
+        if stats is not None:
+            stats.expand(new_cost - 1, len(children), len(priority_queue))
 
     return None  # No solution found
 
@@ -123,12 +118,19 @@ if __name__ == "__main__":
     #     [7, 6, 5]
     # ]
 
-    print("Solving 8-puzzle with Best-First Search...")
+    # Usage: python best_first_search_8_puzzle.py [weight]
+    # Without a weight the search is pure greedy; with one it is weighted A* (f = g + weight*h)
+    weight = float(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    if weight is None:
+        print("Solving 8-puzzle with Best-First Search...")
+    else:
+        print(f"Solving 8-puzzle with Weighted A* (w={weight})...")
     print("Initial State:")
     print_board(initial_board)
     print("-" * 20)
 
-    solution_path = solve_puzzle(initial_board)
+    solution_path = solve_puzzle(initial_board, weight=weight)
 
     if solution_path:
         print(f"Goal state reached in {len(solution_path) - 1} moves!")
@@ -7,36 +7,74 @@ def is_goal(state):
 def get_moves(pos):
 	moves = []
 	row, col = pos // 3, pos % 3
-	if row > 0: moves.append(pos - 3)      # Up
-	if row < 2: moves.append(pos + 3)      # Down
-	if col > 0: moves.append(pos - 1)      # Left
-	if col < 2: moves.append(pos + 1)      # Right
+	if row > 0: moves.append((pos - 3, "Up"))
+	if row < 2: moves.append((pos + 3, "Down"))
+	if col > 0: moves.append((pos - 1, "Left"))
+	if col < 2: moves.append((pos + 1, "Right"))
 	return moves
 
-def dls(state, depth, limit, path, visited):
-	if is_goal(state):
-		return path
-	if depth == limit:
-		return None
-	visited.add(tuple(state))
-	zero_pos = state.index(0)
-	for move in get_moves(zero_pos):
-		new_state = state[:]
-		new_state[zero_pos], new_state[move] = new_state[move], new_state[zero_pos]
-		if tuple(new_state) in visited:
+# MOVES[pos] lists (new blank position, move name) for a blank at pos
+MOVES = [get_moves(pos) for pos in range(9)]
+
+def dls(state, limit, table=None, table_size=None, stats=None):
+	# Explicit-stack depth-limited search. The board is changed in place and
+	# restored on backtracking; blanks[d] is the blank position at depth d and
+	# next_move[d] the index of the next move to try there. A move that undoes
+	# the previous one is skipped.
+	# table (optional) maps tuple(state) -> (shallowest depth seen, limit) across
+	# iterations; a state reached deeper than before is pruned. At most
+	# table_size states are recorded.
+	# stats (optional) is a search-statistics object (see search_stats.py at the
+	# repository root); stats.expand(depth, generated, frontier) is called per node.
+	blanks = [state.index(0)]
+	next_move = [0]
+	path = []
+	while True:
+		if is_goal(state):
+			return path
+		depth = len(path)
+		zero_pos = blanks[-1]
+		moves = MOVES[zero_pos]
+		i = next_move[-1]
+		if depth == limit or i == len(moves):
+			if depth == 0:
+				return None
+			# Unmake the move that led here
+			prev = blanks[-2]
+			state[prev], state[zero_pos] = 0, state[prev]
+			blanks.pop()
+			next_move.pop()
+			path.pop()
 			continue
-		move_name = ["Up", "Down", "Left", "Right"][[move == zero_pos - 3, move == zero_pos + 3, move == zero_pos - 1, move == zero_pos + 1].index(True)]
-		result = dls(new_state, depth + 1, limit, path + [move_name], visited)
-		if result:
-			return result
-	visited.remove(tuple(state))
-	return None
+		if i == 0 and stats is not None:
+			stats.expand(depth, len(moves), len(blanks))
+		next_move[-1] = i + 1
+		move, move_name = moves[i]
+		if depth and move == blanks[-2]:
+			continue
+		state[zero_pos], state[move] = state[move], 0
+		if table is not None:
+			key = tuple(state)
+			seen = table.get(key)
+			if seen is not None and (depth + 1 > seen[0] or (depth + 1 == seen[0] and seen[1] == limit)):
+				state[zero_pos], state[move] = 0, state[zero_pos]
+				continue
+			if seen is not None or table_size is None or len(table) < table_size:
+				table[key] = (depth + 1, limit)
+		blanks.append(move)
+		next_move.append(0)
+		path.append(move_name)
 
-def dfid(start_state, max_depth=20):
+def dfid(start_state, max_depth=20, transposition=False, table_size=None, stats=None):
+	# transposition=True keeps the shallowest depth of each state across iterations
+	# stats (optional) also times every iteration as its own phase
+	state = list(start_state)
+	table = {tuple(state): (0, None)} if transposition else None
 	for limit in range(max_depth + 1):
-		visited = set()
-		result = dls(start_state, 0, limit, [], visited)
-		if result:
+		if stats is not None:
+			stats.phase(f"depth {limit}")
+		result = dls(state, limit, table, table_size, stats)
+		if result is not None:
 			return result
 	return None
 
@@ -45,8 +83,9 @@ def main():
 	state = []
 	for _ in range(9):
 		state.append(int(input()))
-	solution = dfid(state)
-	if solution:
+	# 31 moves is the hardest 8-puzzle instance; the transposition table keeps that depth affordable
+	solution = dfid(state, max_depth=31, transposition=True)
+	if solution is not None:
 		print("Solution found in", len(solution), "moves:")
 		print(" ".join(solution))
 	else:
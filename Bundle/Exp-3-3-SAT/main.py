@@ -1,7 +1,23 @@
+import os
 import random
+import sys
 import time
 import itertools
 
+# The clause/variable occurrence index is shared with the Exp-4 local-search solvers
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Exp-4-3-SAT-HillClimbing"))
+from cnf_store import build_occurrence_index
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the scalar evaluate() path is used without it
+    np = None
+
+# Upper bound on candidate assignments scored per vectorized batch
+BATCH_SIZE = 1024
+# Bytes of (candidates x clauses x width) boolean intermediates allowed per batch
+BATCH_MEMORY = 32 * 1024 * 1024
+
 def parse_dimacs(filename):
     clauses = []
     num_vars = 0
@@ -39,12 +55,67 @@ def evaluate(solution, clauses):
             unsatisfied_count += 1
     return unsatisfied_count
 
-def find_best_neighbor_flip(solution, clauses, k):
+def clause_matrix(clauses):
+    """
+    Precomputes the padded clause-literal lookup used by batch_evaluate.
+    Returns (var_index, present, wanted), each of shape (num_clauses, max_len):
+    the 0-based variable of every literal, whether the slot holds a literal
+    rather than padding, and the value that makes the literal true.
+    """
+    clauses = [list(clause) for clause in clauses]
+    width = max((len(clause) for clause in clauses), default=0)
+    matrix = np.zeros((len(clauses), width), dtype=np.int32)
+    for c, clause in enumerate(clauses):
+        matrix[c, :len(clause)] = clause
+    present = matrix != 0
+    var_index = np.where(present, np.abs(matrix) - 1, 0).astype(np.intp)
+    wanted = matrix > 0
+    return var_index, present, wanted
+
+def batch_evaluate(candidates, clause_lits):
+    """
+    Vectorized evaluate() for many assignments at once.
+    candidates is a (num_candidates, num_vars) boolean matrix, clause_lits the
+    tuple from clause_matrix. Returns the unsatisfied-clause count of every
+    row in one pass.
+    """
+    var_index, present, wanted = clause_lits
+    # (num_candidates, num_clauses, max_len): is each literal true under each candidate?
+    literal_true = (candidates[:, var_index] == wanted) & present
+    return np.count_nonzero(~literal_true.any(axis=2), axis=1)
+
+def find_best_neighbor_flip(solution, clauses, k, clause_lits=None):
+    """
+    Explicit k-flip scan. Since the delta evaluator was added this only runs
+    for variable_neighborhood_descent(delta_eval=False).
+    """
     num_vars = len(solution)
     best_neighbor = list(solution)
     current_fitness = evaluate(solution, clauses)
     best_fitness = current_fitness
 
+    if np is not None:
+        # Score the k-flip neighborhood in batches sized to stay within BATCH_MEMORY
+        if clause_lits is None:
+            clause_lits = clause_matrix(clauses)
+        num_clauses, width = clause_lits[0].shape
+        batch_size = min(BATCH_SIZE, max(1, BATCH_MEMORY // max(1, num_clauses * width)))
+        base = np.array(solution, dtype=bool)
+        combos = itertools.combinations(range(num_vars), k)
+        while True:
+            batch = np.array(list(itertools.islice(combos, batch_size)), dtype=np.intp).reshape(-1, k)
+            if len(batch) == 0:
+                break
+            candidates = np.repeat(base[None, :], len(batch), axis=0)
+            rows = np.arange(len(batch))[:, None]
+            candidates[rows, batch] = ~candidates[rows, batch]
+            scores = batch_evaluate(candidates, clause_lits)
+            i = int(np.argmin(scores))  # first minimum, same tie-breaking as the scalar loop
+            if scores[i] < best_fitness:
+                best_fitness = int(scores[i])
+                best_neighbor = candidates[i].tolist()
+        return best_neighbor, best_fitness
+
     # Generate all combinations of k indices to flip
     indices = range(num_vars)
     for flip_indices in itertools.combinations(indices, k):
@@ -60,6 +131,143 @@ def find_best_neighbor_flip(solution, clauses, k):
     
     return best_neighbor, best_fitness
 
+def variable_neighbors(index):
+    """neighbors[v]: the variables sharing at least one clause with v (index: cnf_store.OccurrenceIndex)."""
+    neighbors = [set() for _ in range(len(index.occ_start) - 1)]
+    for c in range(index.num_clauses):
+        clause_vars = index.clause_vars(c)
+        for v in clause_vars:
+            neighbors[v].update(clause_vars)
+    for v, shared in enumerate(neighbors):
+        shared.discard(v)
+    return neighbors
+
+class DeltaState:
+    """
+    Per-clause true-literal counts for one assignment plus, for every variable,
+    the change in unsatisfied clauses that flipping it alone would cause.
+    A k-flip is scored as the sum of these per-variable deltas, corrected only
+    for the clauses that contain more than one of the flipped variables.
+    """
+    def __init__(self, solution, index, neighbors=None):
+        # index is a cnf_store.OccurrenceIndex; neighbors as from variable_neighbors(index)
+        self.index = index
+        self.clause_start, self.clause_var = index.clause_start, index.clause_var
+        self.clause_pos, self.clause_neg = index.clause_pos, index.clause_neg
+        self.neighbors = variable_neighbors(index) if neighbors is None else neighbors
+        occ_start, occ_clause = index.occ_start, index.occ_clause
+        self.clause_sets = [set(occ_clause[occ_start[v]:occ_start[v + 1]]) for v in range(len(occ_start) - 1)]
+        self.solution = list(solution)
+        self.true_count = [sum(pos if self.solution[v] else neg for v, pos, neg in self.entries(c))
+                           for c in range(index.num_clauses)]
+        self.num_unsat = self.true_count.count(0)
+        self.single = [0] * len(self.solution)
+        for c in range(index.num_clauses):
+            self._add_singles(c, 1)
+
+    def entries(self, c):
+        """(var_index, pos, neg) for every distinct variable of clause c."""
+        start, end = self.clause_start[c], self.clause_start[c + 1]
+        return zip(self.clause_var[start:end], self.clause_pos[start:end], self.clause_neg[start:end])
+
+    def _add_singles(self, c, sign):
+        # Adds (sign=1) or removes (sign=-1) clause c's share of every variable's single-flip delta,
+        # i.e. clause_change(c, (v,)) for each of its variables
+        count = self.true_count[c]
+        was_unsat = count == 0
+        for v, pos, neg in self.entries(c):
+            new_count = count + (neg - pos if self.solution[v] else pos - neg)
+            self.single[v] += sign * ((new_count == 0) - was_unsat)
+
+    def clause_change(self, c, flips):
+        """Change (-1, 0 or +1) in the unsatisfied count of clause c if all of flips are flipped."""
+        count = self.true_count[c]
+        new_count = count
+        for v, pos, neg in self.entries(c):
+            if v in flips:
+                new_count += neg - pos if self.solution[v] else pos - neg
+        return (new_count == 0) - (count == 0)
+
+    def shared_clauses(self, flips):
+        """Clauses containing at least two of the flipped variables."""
+        shared = set()
+        for i, a in enumerate(flips):
+            for b in flips[i + 1:]:
+                shared |= self.clause_sets[a] & self.clause_sets[b]
+        return shared
+
+    def flip_delta(self, flips, shared=None):
+        """Change in unsatisfied clauses after flipping every variable in flips."""
+        delta = sum(self.single[v] for v in flips)
+        if len(flips) > 1:
+            if shared is None:
+                shared = self.shared_clauses(flips)
+            for c in shared:
+                inside = [v for v in self.index.clause_vars(c) if v in flips]
+                delta += self.clause_change(c, flips) - sum(self.clause_change(c, (v,)) for v in inside)
+        return delta
+
+    def flip(self, flips):
+        """Applies a k-flip, updating only the clauses that contain a flipped variable."""
+        affected = set().union(*(self.clause_sets[v] for v in flips))
+        for c in affected:
+            self._add_singles(c, -1)
+        for c in affected:
+            was_unsat = self.true_count[c] == 0
+            for v, pos, neg in self.entries(c):
+                if v in flips:
+                    self.true_count[c] += neg - pos if self.solution[v] else pos - neg
+            self.num_unsat += (self.true_count[c] == 0) - was_unsat
+        for v in flips:
+            self.solution[v] = not self.solution[v]
+        for c in affected:
+            self._add_singles(c, 1)
+
+    def unsat_vars(self):
+        """Variables that occur in at least one unsatisfied clause."""
+        return {v for c, count in enumerate(self.true_count) if count == 0 for v in self.index.clause_vars(c)}
+
+def connected_flip_sets(state, k):
+    """
+    Sorted k-tuples of variables that are connected through shared clauses and
+    contain at least one variable of an unsatisfied clause.
+    Any other k-flip cannot improve a solution where no smaller flip improves:
+    without an unsatisfied-clause variable no clause gets satisfied, and a
+    disconnected flip scores as the sum of its smaller, non-improving parts.
+    """
+    sets = {(v,) for v in state.unsat_vars()}
+    for _ in range(k - 1):
+        grown = set()
+        for flips in sets:
+            reachable = set().union(*(state.neighbors[v] for v in flips))
+            for x in reachable.difference(flips):
+                grown.add(tuple(sorted(flips + (x,))))
+        sets = grown
+    return sets
+
+def find_best_neighbor_flip_delta(state, k):
+    """
+    Delta-evaluated counterpart of find_best_neighbor_flip for VND, valid once
+    all neighborhoods smaller than k have no improving move.
+    Returns (flip_indices, fitness) of the best improving k-flip, or (None, current fitness).
+    Ties go to the lexicographically smallest flip, like itertools.combinations order.
+    """
+    best_flips = None
+    best_delta = 0
+    single = state.single
+    for flips in connected_flip_sets(state, k):
+        base = sum(single[v] for v in flips)
+        shared = ()
+        if k > 1:
+            # Each shared clause can lower the summed deltas by at most 1
+            shared = state.shared_clauses(flips)
+            if base - len(shared) > best_delta:
+                continue
+        delta = state.flip_delta(flips, shared)
+        if delta < best_delta or (delta == best_delta and best_flips is not None and flips < best_flips):
+            best_flips, best_delta = flips, delta
+    return best_flips, state.num_unsat + best_delta
+
 def shake(solution, k):
     num_vars = len(solution)
     shaken_solution = list(solution)
@@ -72,13 +280,23 @@ def shake(solution, k):
         
     return shaken_solution
 
-def variable_neighborhood_descent(num_vars, clauses, max_iter=100, k_max=3, timeout_seconds=60):
+def variable_neighborhood_descent(num_vars, clauses, max_iter=100, k_max=3, timeout_seconds=60, delta_eval=True):
+    """
+    VND with shaking. With delta_eval=True the k-flip neighborhoods are scored
+    from per-variable deltas (DeltaState) and pruned to connected flips touching
+    an unsatisfied clause; delta_eval=False scans every combination explicitly.
+    Both modes pick the same moves.
+    """
     start_time = time.time()
     
     # 1. Generate a random initial solution
     current_solution = [random.choice([True, False]) for _ in range(num_vars)]
     best_solution = list(current_solution)
     best_fitness = evaluate(best_solution, clauses)
+    if delta_eval:
+        index = build_occurrence_index(num_vars, clauses)
+        neighbors = variable_neighbors(index)
+    clause_lits = clause_matrix(clauses) if np is not None and not delta_eval else None
 
     print(f"Initial random solution has {best_fitness} unsatisfied clauses.")
 
@@ -89,13 +307,24 @@ def variable_neighborhood_descent(num_vars, clauses, max_iter=100, k_max=3, time
         
         # 2. Variable Neighborhood Search (Local Search Phase)
         local_optimum = list(current_solution)
+        if delta_eval:
+            state = DeltaState(local_optimum, index, neighbors)
         while k <= k_max:
             # Find the best neighbor in the k-flip neighborhood
-            neighbor, neighbor_fitness = find_best_neighbor_flip(local_optimum, clauses, k)
+            if delta_eval:
+                flips, neighbor_fitness = find_best_neighbor_flip_delta(state, k)
+                improved = flips is not None
+                if improved:
+                    state.flip(flips)
+                    local_optimum = list(state.solution)
+            else:
+                neighbor, neighbor_fitness = find_best_neighbor_flip(local_optimum, clauses, k, clause_lits)
+                improved = neighbor_fitness < evaluate(local_optimum, clauses)
+                if improved:
+                    local_optimum = neighbor
             
             # If the neighbor is an improvement, move to it and restart search from k=1
-            if neighbor_fitness < evaluate(local_optimum, clauses):
-                local_optimum = neighbor
+            if improved:
                 print(f"  [Iter {iteration}, k={k}] Found improvement. New fitness: {neighbor_fitness}")
                 k = 1 # Go back to the first neighborhood
             else:
@@ -0,0 +1,322 @@
+import heapq
+import os
+import sys
+import time
+
+from cnf_store import load_cnf
+from main import evaluate, parse_dimacs, walksat
+
+# Literals are encoded as 2 * var_index + (1 if negated), so lit ^ 1 is its negation
+TRUE, FALSE, UNASSIGNED = 1, -1, 0
+
+def encode_literal(literal):
+    return 2 * (abs(literal) - 1) + (literal < 0)
+
+def luby(i):
+    """i-th element (0-based) of the Luby restart sequence 1 1 2 1 1 2 4 1 1 2 ..."""
+    size, seq = 1, 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i %= size
+    return 1 << seq
+
+class CDCLSolver:
+    """
+    Complete SAT solver: unit propagation with two watched literals, first-UIP
+    conflict analysis with clause learning, non-chronological backjumping,
+    VSIDS branching with phase saving and Luby restarts.
+    The saved phases can be seeded from a local-search assignment.
+    """
+    def __init__(self, num_vars, clauses, phase=None, restart_base=100, var_decay=0.95):
+        if phase is not None and len(phase) != num_vars:
+            raise ValueError(f"phase has {len(phase)} values, expected one per variable ({num_vars})")
+        self.num_vars = num_vars
+        self.lit_value = [UNASSIGNED] * (2 * num_vars)
+        self.level = [0] * num_vars
+        self.reason = [None] * num_vars
+        self.trail = []
+        self.trail_lim = []  # trail index where each decision level starts
+        self.qhead = 0
+        self.watches = [[] for _ in range(2 * num_vars)]
+        self.learnts = []
+        self.activity = [0.0] * num_vars
+        self.var_inc = 1.0
+        self.var_decay = var_decay
+        self.order_heap = [(0.0, v) for v in range(num_vars)]
+        self.saved_phase = list(phase) if phase is not None else [False] * num_vars
+        self.restart_base = restart_base
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.ok = True
+
+        for clause in clauses:
+            lits = set(encode_literal(x) for x in clause)
+            if any(lit ^ 1 in lits for lit in lits):
+                continue  # tautology
+            if not self.add_clause(sorted(lits)):
+                self.ok = False
+                break
+
+    def add_clause(self, lits, learnt=False):
+        """Adds a clause at decision level 0. Returns False if the formula became unsatisfiable."""
+        if not learnt:
+            lits = [lit for lit in lits if self.lit_value[lit] != FALSE]
+            if any(self.lit_value[lit] == TRUE for lit in lits):
+                return True
+        if not lits:
+            return False
+        if len(lits) == 1:
+            if self.lit_value[lits[0]] == FALSE:
+                return False
+            if self.lit_value[lits[0]] == UNASSIGNED:
+                self.enqueue(lits[0], None)
+            return self.propagate() is None
+        self.watches[lits[0]].append(lits)
+        self.watches[lits[1]].append(lits)
+        if learnt:
+            self.learnts.append(lits)
+        return True
+
+    def enqueue(self, lit, reason):
+        v = lit >> 1
+        self.lit_value[lit] = TRUE
+        self.lit_value[lit ^ 1] = FALSE
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(lit)
+
+    def propagate(self):
+        """Unit propagation over the watch lists. Returns a conflicting clause or None."""
+        lit_value = self.lit_value
+        watches = self.watches
+        while self.qhead < len(self.trail):
+            false_lit = self.trail[self.qhead] ^ 1
+            self.qhead += 1
+            self.propagations += 1
+            # Compact the watch list in place: watchers[:j] are the clauses that keep watching
+            watchers = watches[false_lit]
+            j = 0
+            for i, clause in enumerate(watchers):
+                if not clause:
+                    continue  # deleted learnt clause
+                # Keep the false literal in slot 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if lit_value[first] != TRUE:
+                    # Look for a new literal to watch
+                    for k in range(2, len(clause)):
+                        if lit_value[clause[k]] != FALSE:
+                            clause[1], clause[k] = clause[k], false_lit
+                            watches[clause[1]].append(clause)
+                            break
+                    else:
+                        if lit_value[first] == FALSE:
+                            rest = watchers[i:]
+                            del watchers[j:]
+                            watchers.extend(rest)
+                            self.qhead = len(self.trail)
+                            return clause
+                        self.enqueue(first, clause)
+                        watchers[j] = clause
+                        j += 1
+                    continue
+                watchers[j] = clause
+                j += 1
+            del watchers[j:]
+        return None
+
+    def analyze(self, conflict):
+        """First-UIP learning. Returns (learnt clause with the asserting literal first, backjump level)."""
+        seen = [False] * self.num_vars
+        learnt = [None]
+        current_level = len(self.trail_lim)
+        pending = 0
+        lit = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for q in (clause if lit is None else clause[1:]):
+                v = q >> 1
+                if not seen[v] and self.level[v] > 0:
+                    seen[v] = True
+                    self.bump(v)
+                    if self.level[v] == current_level:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            # Walk back to the next marked literal of the current level
+            while not seen[self.trail[index] >> 1]:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            seen[lit >> 1] = False
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reason[lit >> 1]
+            # Reason clauses keep their implied literal in slot 0
+            if clause[0] != lit:
+                j = clause.index(lit)
+                clause[0], clause[j] = clause[j], clause[0]
+        learnt[0] = lit ^ 1
+        if len(learnt) == 1:
+            return learnt, 0
+        # Watch the literal with the highest level in slot 1 so backjumping keeps the watches valid
+        best = max(range(1, len(learnt)), key=lambda j: self.level[learnt[j] >> 1])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, self.level[learnt[1] >> 1]
+
+    def bump(self, v):
+        self.activity[v] += self.var_inc
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.var_inc *= 1e-100
+            self.order_heap = [(-self.activity[u], u) for u in range(self.num_vars) if self.lit_value[2 * u] == UNASSIGNED]
+            heapq.heapify(self.order_heap)
+        else:
+            heapq.heappush(self.order_heap, (-self.activity[v], v))
+
+    def backjump(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            v = lit >> 1
+            self.saved_phase[v] = not (lit & 1)
+            self.lit_value[lit] = self.lit_value[lit ^ 1] = UNASSIGNED
+            self.reason[v] = None
+            heapq.heappush(self.order_heap, (-self.activity[v], v))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def pick_branch_variable(self):
+        # Lazy-deletion heap: skip assigned variables and outdated activity entries
+        if len(self.order_heap) > 10 * self.num_vars + 1000:
+            self.order_heap = [(-self.activity[v], v) for v in range(self.num_vars) if self.lit_value[2 * v] == UNASSIGNED]
+            heapq.heapify(self.order_heap)
+        while self.order_heap:
+            neg_activity, v = heapq.heappop(self.order_heap)
+            if self.lit_value[2 * v] == UNASSIGNED and -neg_activity == self.activity[v]:
+                return v
+        for v in range(self.num_vars):
+            if self.lit_value[2 * v] == UNASSIGNED:
+                return v
+        return None
+
+    def reduce_learnts(self):
+        """Drops the longer half of the learnt clauses that are not currently a reason."""
+        locked = {id(self.reason[lit >> 1]) for lit in self.trail if self.reason[lit >> 1] is not None}
+        self.learnts.sort(key=len)
+        keep = len(self.learnts) // 2
+        for clause in self.learnts[keep:]:
+            if id(clause) in locked or len(clause) <= 2:
+                continue
+            clause.clear()  # watch lists drop it lazily
+        self.learnts = [c for c in self.learnts if c]
+
+    def solve(self, max_conflicts=None, timeout_seconds=None):
+        """Returns True (satisfiable), False (unsatisfiable) or None (budget exhausted)."""
+        if not self.ok:
+            return False
+        start_time = time.time()
+        max_learnts = max(1000, len(self.watches) // 2)
+        restart = 0
+        while True:
+            conflicts_until_restart = luby(restart) * self.restart_base
+            while True:
+                conflict = self.propagate()
+                if conflict is not None:
+                    self.conflicts += 1
+                    conflicts_until_restart -= 1
+                    if not self.trail_lim:
+                        return False
+                    learnt, level = self.analyze(conflict)
+                    self.backjump(level)
+                    if len(learnt) == 1:
+                        self.enqueue(learnt[0], None)
+                    else:
+                        self.add_clause(learnt, learnt=True)
+                        self.enqueue(learnt[0], learnt)
+                    self.var_inc /= self.var_decay
+                    if max_conflicts is not None and self.conflicts >= max_conflicts:
+                        return None
+                    if timeout_seconds is not None and self.conflicts % 100 == 0 \
+                            and time.time() - start_time >= timeout_seconds:
+                        return None
+                    continue
+
+                if conflicts_until_restart <= 0:
+                    self.backjump(0)
+                    restart += 1
+                    break
+                if len(self.learnts) - len(self.trail) >= max_learnts:
+                    self.reduce_learnts()
+                    max_learnts = int(max_learnts * 1.1)
+                v = self.pick_branch_variable()
+                if v is None:
+                    return True
+                self.decisions += 1
+                self.trail_lim.append(len(self.trail))
+                self.enqueue(2 * v + (not self.saved_phase[v]), None)
+
+    def model(self):
+        return [self.lit_value[2 * v] == TRUE for v in range(self.num_vars)]
+
+def cdcl(num_vars, clauses, phase=None, max_conflicts=None, timeout_seconds=None, stats=None):
+    """
+    Runs the complete solver on parse_dimacs/load_cnf input.
+    phase is an optional initial assignment (e.g. the best one found by local search).
+    Returns (solution, satisfiable) with satisfiable True/False, or None when the
+    conflict/time budget ran out (solution is then None too).
+    stats (optional, see search_stats.py at the repository root) receives the
+    "conflicts", "decisions" and "propagations" counters.
+    """
+    start_time = time.time()
+    solver = CDCLSolver(num_vars, clauses, phase)
+    result = solver.solve(max_conflicts, timeout_seconds)
+    elapsed_time = time.time() - start_time
+    print(f"CDCL finished in {elapsed_time:.2f} seconds: {solver.conflicts} conflicts, "
+          f"{solver.decisions} decisions, {solver.propagations} propagations.")
+    if stats is not None:
+        stats.add("conflicts", solver.conflicts)
+        stats.add("decisions", solver.decisions)
+        stats.add("propagations", solver.propagations)
+    return (solver.model() if result else None), result
+
+if __name__ == "__main__":
+    # Usage: python cdcl.py [file.cnf[.gz|.xz]] [--phase]
+    # --phase runs WalkSAT first and uses its best assignment as the initial phase
+    use_phase = "--phase" in sys.argv
+    args = [a for a in sys.argv[1:] if a != "--phase"]
+    if args:
+        filename = args[0]
+        num_variables, sat_clauses = load_cnf(filename)
+    else:
+        filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "sample.cnf")
+        num_variables, sat_clauses = parse_dimacs(filename)
+
+    print(f"Solving SAT problem from {filename} with CDCL...")
+
+    if num_variables > 0:
+        phase = None
+        if use_phase:
+            phase, _ = walksat(num_variables, sat_clauses, max_tries=1, max_flips=100 * num_variables)
+        solution, satisfiable = cdcl(num_variables, sat_clauses, phase)
+
+        print("\n--- Results ---")
+        if satisfiable:
+            print("SATISFIABLE: A valid assignment was found.")
+            print(f"Unsatisfied clauses: {evaluate(solution, sat_clauses)}")
+            readable_solution = {i + 1: val for i, val in enumerate(solution)}
+            print(f"Variable assignments: {readable_solution}")
+        elif satisfiable is None:
+            print("UNKNOWN: the solver ran out of time before deciding the formula.")
+        else:
+            print("UNSATISFIABLE: no assignment satisfies every clause.")
@@ -0,0 +1,254 @@
+import bz2
+import gzip
+import lzma
+import mmap
+import os
+import struct
+from array import array
+
+# Binary cache layout: header, then clause offsets (int64), then literals (int32)
+CACHE_MAGIC = b"FLATCNF1"
+CACHE_HEADER = struct.Struct("<8sqqqqq")  # magic, num_vars, num_clauses, num_literals, source size, source mtime_ns
+CHUNK_SIZE = 1 << 22
+
+class FlatCNF:
+    """
+    CSR-style clause storage: one flat int32 buffer with every literal and an
+    offsets buffer where clause c is literals[offsets[c]:offsets[c + 1]].
+    Iterating yields the clauses one by one, so it can be passed anywhere a
+    list of clauses from parse_dimacs is expected (evaluate, SATState, ...);
+    build_occurrence_index reads the buffers directly.
+    """
+    def __init__(self, num_vars, literals, offsets):
+        self.num_vars = num_vars
+        self.literals = literals
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, c):
+        return self.literals[self.offsets[c]:self.offsets[c + 1]]
+
+    def __iter__(self):
+        literals, offsets = self.literals, self.offsets
+        for c in range(len(offsets) - 1):
+            yield literals[offsets[c]:offsets[c + 1]]
+
+def flatten_clauses(num_vars, clauses):
+    """FlatCNF of any iterable of clauses (a FlatCNF is returned as it is)."""
+    if isinstance(clauses, FlatCNF):
+        return clauses
+    literals = array("i")
+    offsets = array("q", [0])
+    for clause in clauses:
+        literals.extend(clause)
+        offsets.append(len(literals))
+    return FlatCNF(num_vars, literals, offsets)
+
+class OccurrenceIndex:
+    """
+    Clause/variable incidence of a formula in CSR arrays, so the solver state
+    built on it stays as compact as the FlatCNF it comes from.
+    The distinct variables of clause c are entries clause_start[c] ..
+    clause_start[c + 1] - 1 of clause_var/clause_pos/clause_neg, where pos/neg
+    count how often the variable appears as a positive/negative literal.
+    The clauses of variable v are entries occ_start[v] .. occ_start[v + 1] - 1
+    of occ_clause/occ_pos/occ_neg.
+    """
+    def __init__(self, clause_start, clause_var, clause_pos, clause_neg, occ_start, occ_clause, occ_pos, occ_neg):
+        self.clause_start = clause_start
+        self.clause_var = clause_var
+        self.clause_pos = clause_pos
+        self.clause_neg = clause_neg
+        self.occ_start = occ_start
+        self.occ_clause = occ_clause
+        self.occ_pos = occ_pos
+        self.occ_neg = occ_neg
+
+    @property
+    def num_clauses(self):
+        return len(self.clause_start) - 1
+
+    def clause_vars(self, c):
+        """The distinct variables of clause c."""
+        return self.clause_var[self.clause_start[c]:self.clause_start[c + 1]]
+
+def build_occurrence_index(num_vars, clauses):
+    """
+    Builds the OccurrenceIndex of a FlatCNF (or any iterable of clauses) once,
+    right after loading, straight from the flat literal and offset buffers.
+    """
+    cnf = flatten_clauses(num_vars, clauses)
+    literals, offsets = cnf.literals, cnf.offsets
+    clause_start = array("q", [0])
+    clause_var = array("i")
+    clause_pos = array("i")
+    clause_neg = array("i")
+    # slot[v]: entry of v in the clause being read, if it is >= that clause's first entry
+    slot = array("q", [-1]) * num_vars
+    occ_count = array("q", [0]) * (num_vars + 1)
+    for c in range(len(offsets) - 1):
+        first = len(clause_var)
+        for k in range(offsets[c], offsets[c + 1]):
+            literal = literals[k]
+            v = abs(literal) - 1
+            e = slot[v]
+            if e < first:
+                e = slot[v] = len(clause_var)
+                clause_var.append(v)
+                clause_pos.append(0)
+                clause_neg.append(0)
+                occ_count[v + 1] += 1
+            if literal > 0:
+                clause_pos[e] += 1
+            else:
+                clause_neg[e] += 1
+        clause_start.append(len(clause_var))
+    for v in range(num_vars):
+        occ_count[v + 1] += occ_count[v]
+    occ_start = array("q", occ_count)
+    entries = len(clause_var)
+    occ_clause = array("i", [0]) * entries
+    occ_pos = array("i", [0]) * entries
+    occ_neg = array("i", [0]) * entries
+    fill = occ_count[:num_vars]
+    for c in range(len(clause_start) - 1):
+        for e in range(clause_start[c], clause_start[c + 1]):
+            v = clause_var[e]
+            i = fill[v]
+            occ_clause[i] = c
+            occ_pos[i] = clause_pos[e]
+            occ_neg[i] = clause_neg[e]
+            fill[v] = i + 1
+    return OccurrenceIndex(clause_start, clause_var, clause_pos, clause_neg, occ_start, occ_clause, occ_pos, occ_neg)
+
+def open_cnf_file(filename):
+    """Opens a DIMACS file in binary mode, transparently decompressing .gz/.xz/.bz2."""
+    if filename.endswith(".gz"):
+        return gzip.open(filename, "rb")
+    if filename.endswith(".xz") or filename.endswith(".lzma"):
+        return lzma.open(filename, "rb")
+    if filename.endswith(".bz2"):
+        return bz2.open(filename, "rb")
+    return open(filename, "rb")
+
+def stream_dimacs(filename, chunk_size=CHUNK_SIZE):
+    """
+    Parses a DIMACS file in bulk chunks straight into a FlatCNF.
+    Clauses are delimited by their terminating 0 (not by line breaks), so a
+    clause may span lines or chunks. Empty clauses are skipped like in parse_dimacs.
+    """
+    num_vars = 0
+    literals = array("i")
+    offsets = array("q", [0])
+    rest = b""
+    with open_cnf_file(filename) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if chunk:
+                data = rest + chunk
+                cut = data.rfind(b"\n") + 1
+                if cut == 0:
+                    rest = data
+                    continue
+                data, rest = data[:cut], data[cut:]
+            else:
+                data, rest = rest, b""
+            # Fast path: chunks without comment/header lines are split as one token stream
+            if b"c" in data or b"p" in data or b"%" in data:
+                body = []
+                for line in data.split(b"\n"):
+                    line = line.strip()
+                    if not line or line[:1] == b"c":
+                        continue
+                    if line[:1] == b"p":
+                        num_vars = int(line.split()[2])
+                    elif line[:1] == b"%":
+                        # SATLIB end marker, everything after it is padding
+                        chunk = b""
+                        break
+                    else:
+                        body.append(line)
+                data = b" ".join(body)
+            values = array("i", map(int, data.split()))
+            # Literals are never 0, so the k-th terminator at position z closes a clause
+            # ending at base + z - k once the terminators are filtered out
+            base = len(literals)
+            literals.extend(filter(None, values))
+            z = -1
+            k = 0
+            while True:
+                try:
+                    z = values.index(0, z + 1)
+                except ValueError:
+                    break
+                end = base + z - k
+                k += 1
+                if end != offsets[-1]:
+                    offsets.append(end)
+            if not chunk:
+                break
+    if len(literals) != offsets[-1]:
+        # Last clause without a terminating 0
+        offsets.append(len(literals))
+    return FlatCNF(num_vars, literals, offsets)
+
+def cache_path_for(filename):
+    return filename + ".flatcnf"
+
+def save_cache(cnf, filename, cache_file):
+    """Writes cnf as a binary cache tagged with the source file's size and mtime."""
+    st = os.stat(filename)
+    with open(cache_file, "wb") as f:
+        f.write(CACHE_HEADER.pack(CACHE_MAGIC, cnf.num_vars, len(cnf), len(cnf.literals), st.st_size, st.st_mtime_ns))
+        f.write(array("q", cnf.offsets).tobytes())
+        f.write(array("i", cnf.literals).tobytes())
+
+def map_cache(filename, cache_file):
+    """
+    Memory-maps a binary cache written by save_cache. The clause buffers are
+    zero-copy views into the mapping. Returns None if the cache is missing,
+    corrupt or older than the source file.
+    """
+    try:
+        f = open(cache_file, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        header = f.read(CACHE_HEADER.size)
+        if len(header) < CACHE_HEADER.size:
+            return None
+        magic, num_vars, num_clauses, num_literals, size, mtime_ns = CACHE_HEADER.unpack(header)
+        st = os.stat(filename)
+        if magic != CACHE_MAGIC or size != st.st_size or mtime_ns != st.st_mtime_ns:
+            return None
+        if os.fstat(f.fileno()).st_size != CACHE_HEADER.size + 8 * (num_clauses + 1) + 4 * num_literals:
+            return None
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    offsets_end = CACHE_HEADER.size + 8 * (num_clauses + 1)
+    offsets = view[CACHE_HEADER.size:offsets_end].cast("q")
+    literals = view[offsets_end:].cast("i")
+    return FlatCNF(num_vars, literals, offsets)
+
+def load_cnf(filename, use_cache=False):
+    """
+    Drop-in replacement for parse_dimacs returning (num_vars, FlatCNF).
+    With use_cache=True a binary copy is written next to the source on the
+    first load and memory-mapped on later loads while the source is unchanged.
+    """
+    try:
+        if use_cache:
+            cache_file = cache_path_for(filename)
+            os.stat(filename)
+            cnf = map_cache(filename, cache_file)
+            if cnf is None:
+                cnf = stream_dimacs(filename)
+                save_cache(cnf, filename, cache_file)
+        else:
+            cnf = stream_dimacs(filename)
+    except FileNotFoundError:
+        print(f"Error: The file '{filename}' was not found.")
+        return 0, FlatCNF(0, array("i"), array("q", [0]))
+    return cnf.num_vars, cnf
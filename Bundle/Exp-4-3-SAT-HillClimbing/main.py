@@ -1,5 +1,9 @@
 import random
+import sys
 import time
+from array import array
+
+from cnf_store import build_occurrence_index, load_cnf
 
 def parse_dimacs(filename):
     clauses = []
@@ -36,41 +40,136 @@ def evaluate(solution, clauses):
             unsatisfied_count += 1
     return unsatisfied_count
 
-def stochastic_hill_climbing(num_vars, clauses, max_restarts=50, max_steps=1000):
+class SATState:
+    """
+    Incremental bookkeeping for one assignment.
+    Keeps the number of true literals of every clause, the list of currently
+    unsatisfied clauses (with each clause's position in it, for O(1) removal)
+    and, for every variable,
+    its break count (satisfied clauses that a flip would falsify) and make count
+    (unsatisfied clauses that a flip would satisfy). Flipping a variable only
+    touches the clauses that contain it, so the fitness of any neighbor is
+    num_unsat - make[v] + break_count[v] without re-evaluating the formula.
+    """
+    def __init__(self, num_vars, clauses, solution, index=None):
+        # index is a cnf_store.OccurrenceIndex; per-clause state lives in flat arrays too
+        if index is None:
+            index = build_occurrence_index(num_vars, clauses)
+        self.index = index
+        self.solution = list(solution)
+        num_clauses = index.num_clauses
+        self.true_count = array("i", [0]) * num_clauses
+        self.break_count = [0] * num_vars
+        self.make = [0] * num_vars
+        self.unsat = []
+        self.unsat_pos = array("i", [-1]) * num_clauses
+        clause_start, clause_var = index.clause_start, index.clause_var
+        clause_pos, clause_neg = index.clause_pos, index.clause_neg
+        solution = self.solution
+        for c in range(num_clauses):
+            count = 0
+            for e in range(clause_start[c], clause_start[c + 1]):
+                count += clause_pos[e] if solution[clause_var[e]] else clause_neg[e]
+            self.true_count[c] = count
+            if count == 0:
+                self._add_unsat(c)
+        self._score_clauses(range(num_clauses), 1)
+
+    @property
+    def num_unsat(self):
+        return len(self.unsat)
+
+    def _add_unsat(self, c):
+        self.unsat_pos[c] = len(self.unsat)
+        self.unsat.append(c)
+
+    def _remove_unsat(self, c):
+        # Swap the last unsatisfied clause into c's slot
+        i = self.unsat_pos[c]
+        last = self.unsat.pop()
+        if last != c:
+            self.unsat[i] = last
+            self.unsat_pos[last] = i
+        self.unsat_pos[c] = -1
+
+    def _score_clauses(self, clauses, sign):
+        # Adds (sign=1) or removes (sign=-1) the clauses' contribution to break/make.
+        index = self.index
+        clause_start, clause_var = index.clause_start, index.clause_var
+        clause_pos, clause_neg = index.clause_pos, index.clause_neg
+        solution, true_count, make, break_count = self.solution, self.true_count, self.make, self.break_count
+        for c in clauses:
+            count = true_count[c]
+            for e in range(clause_start[c], clause_start[c + 1]):
+                v = clause_var[e]
+                if solution[v]:
+                    now, after = clause_pos[e], clause_neg[e]
+                else:
+                    now, after = clause_neg[e], clause_pos[e]
+                if count == 0:
+                    if after:
+                        make[v] += sign
+                elif count == now and not after:
+                    break_count[v] += sign
+
+    def fitness_after_flip(self, var_index):
+        """Unsatisfied clauses the assignment would have after flipping var_index."""
+        return self.num_unsat - self.make[var_index] + self.break_count[var_index]
+
+    def flip(self, var_index):
+        """Flips var_index, updating only the clauses that contain it."""
+        index = self.index
+        first, last = index.occ_start[var_index], index.occ_start[var_index + 1]
+        affected = index.occ_clause[first:last]
+        self._score_clauses(affected, -1)
+        value = self.solution[var_index]
+        self.solution[var_index] = not value
+        true_count = self.true_count
+        for c, pos, neg in zip(affected, index.occ_pos[first:last], index.occ_neg[first:last]):
+            before = true_count[c]
+            after = before + (neg - pos if value else pos - neg)
+            true_count[c] = after
+            if before == 0 and after > 0:
+                self._remove_unsat(c)
+            elif before > 0 and after == 0:
+                self._add_unsat(c)
+        self._score_clauses(affected, 1)
+
+def stochastic_hill_climbing(num_vars, clauses, max_restarts=50, max_steps=1000, stats=None):
+    # stats (optional) is a search-statistics object (see search_stats.py at the
+    # repository root); it receives the "flips" and "restarts" counters
     start_time = time.time()
+    flips = 0
     best_solution_so_far = []
     best_fitness_so_far = float('inf')
 
+    # The occurrence index only depends on the formula, so build it once for all restarts
+    index = build_occurrence_index(num_vars, clauses)
+
     for restart in range(max_restarts):
         # 1. Start with a random solution
-        current_solution = [random.choice([True, False]) for _ in range(num_vars)]
+        state = SATState(num_vars, clauses, [random.choice([True, False]) for _ in range(num_vars)], index)
         
         # Keep track of the best solution for this specific run
         if not best_solution_so_far:
-            best_solution_so_far = list(current_solution)
-            best_fitness_so_far = evaluate(current_solution, clauses)
+            best_solution_so_far = list(state.solution)
+            best_fitness_so_far = state.num_unsat
 
-        print(f"\n[Restart #{restart + 1}] Starting with a new random solution. Initial unsatisfied: {evaluate(current_solution, clauses)}")
+        print(f"\n[Restart #{restart + 1}] Starting with a new random solution. Initial unsatisfied: {state.num_unsat}")
 
         for step in range(max_steps):
-            current_fitness = evaluate(current_solution, clauses)
+            current_fitness = state.num_unsat
 
             # If a perfect solution is found, we're done
             if current_fitness == 0:
                 print(">>> Perfect solution found! <<<")
-                return current_solution, 0
+                if stats is not None:
+                    stats.add("flips", flips)
+                    stats.add("restarts", restart + 1)
+                return state.solution, 0
 
-            # 2. Find all neighbors that are an improvement
-            improving_neighbors = []
-            for i in range(num_vars):
-                # Create a neighbor by flipping the i-th variable
-                neighbor_solution = list(current_solution)
-                neighbor_solution[i] = not neighbor_solution[i]
-                
-                neighbor_fitness = evaluate(neighbor_solution, clauses)
-
-                if neighbor_fitness < current_fitness:
-                    improving_neighbors.append((neighbor_solution, neighbor_fitness))
+            # 2. Find all neighbors that are an improvement (flipping i is better iff make > break)
+            improving_neighbors = [i for i in range(num_vars) if state.make[i] > state.break_count[i]]
 
             # 3. Choose the next move
             if not improving_neighbors:
@@ -79,26 +178,123 @@ def stochastic_hill_climbing(num_vars, clauses, max_restarts=50, max_steps=1000)
                 break
             
             # STOCHASTIC step: Randomly choose from the list of better options
-            chosen_neighbor, chosen_fitness = random.choice(improving_neighbors)
-            current_solution = chosen_neighbor
+            state.flip(random.choice(improving_neighbors))
+            flips += 1
+            chosen_fitness = state.num_unsat
             
             # Update the best-ever solution if this step is an improvement
             if chosen_fitness < best_fitness_so_far:
                 best_fitness_so_far = chosen_fitness
-                best_solution_so_far = list(current_solution)
+                best_solution_so_far = list(state.solution)
                 print(f"  Step {step+1}: New best fitness found: {best_fitness_so_far}")
 
         # Check if this restart found a better solution than previous restarts
-        final_run_fitness = evaluate(current_solution, clauses)
+        final_run_fitness = state.num_unsat
         if final_run_fitness < best_fitness_so_far:
             best_fitness_so_far = final_run_fitness
-            best_solution_so_far = list(current_solution)
+            best_solution_so_far = list(state.solution)
 
     elapsed_time = time.time() - start_time
     print(f"\nSearch finished in {elapsed_time:.2f} seconds.")
+    if stats is not None:
+        stats.add("flips", flips)
+        stats.add("restarts", max_restarts)
     return best_solution_so_far, best_fitness_so_far
 
+def walksat_pick(state, clause, noise):
+    """
+    WalkSAT/SKC variable choice inside unsatisfied clause `clause` (an index): take a "freebie"
+    (break count 0) if there is one, otherwise a random variable with probability
+    noise, otherwise one with the smallest break count.
+    """
+    candidates = state.index.clause_vars(clause)
+    breaks = [state.break_count[v] for v in candidates]
+    lowest = min(breaks)
+    if lowest > 0 and random.random() < noise:
+        return random.choice(candidates)
+    return random.choice([v for v, b in zip(candidates, breaks) if b == lowest])
+
+def probsat_pick(state, clause, cb=2.38, eps=1.0):
+    """
+    probSAT (polynomial break-only variant): pick a variable of the clause with
+    probability proportional to (eps + break)^-cb.
+    """
+    candidates = state.index.clause_vars(clause)
+    weights = [(eps + state.break_count[v]) ** -cb for v in candidates]
+    return random.choices(candidates, weights)[0]
+
+def random_walk_sat(num_vars, clauses, pick=walksat_pick, max_tries=10, max_flips=100000, timeout_seconds=60,
+                    stats=None, **pick_args):
+    """
+    Focused random walk: every flip takes a random unsatisfied clause and flips
+    one of its variables chosen by pick (walksat_pick or probsat_pick).
+    Only the clauses of the flipped variable are touched, so a flip costs
+    O(occurrences) regardless of the formula size.
+    Returns (best_solution, unsatisfied) like stochastic_hill_climbing.
+    stats (optional) receives the "flips" and "tries" counters.
+    """
+    start_time = time.time()
+    flips = 0
+    index = build_occurrence_index(num_vars, clauses)
+    best_solution = []
+    best_fitness = float('inf')
+    tries = 0
+
+    for attempt in range(max_tries):
+        tries += 1
+        state = SATState(num_vars, clauses, [random.choice([True, False]) for _ in range(num_vars)], index)
+        print(f"\n[Try #{attempt + 1}] Initial unsatisfied: {state.num_unsat}")
+
+        flip = 0
+        while True:
+            # Recorded after every flip, so a solution reached on the last flip is kept
+            if state.num_unsat < best_fitness:
+                best_fitness = state.num_unsat
+                best_solution = list(state.solution)
+            if state.num_unsat == 0:
+                print(f">>> Perfect solution found after {flip} flips! <<<")
+                break
+            if flip == max_flips:
+                print(f"  Flip limit reached with {state.num_unsat} unsatisfied clauses (best {best_fitness}).")
+                break
+            if flip % 1000 == 0 and time.time() - start_time >= timeout_seconds:
+                break
+            state.flip(pick(state, random.choice(state.unsat), **pick_args))
+            flip += 1
+            flips += 1
+
+        if best_fitness == 0 or time.time() - start_time >= timeout_seconds:
+            break
+
+    elapsed_time = time.time() - start_time
+    print(f"\nSearch finished in {elapsed_time:.2f} seconds.")
+    if stats is not None:
+        stats.add("flips", flips)
+        stats.add("tries", tries)
+    return best_solution, best_fitness
+
+def walksat(num_vars, clauses, noise=0.5, **kwargs):
+    return random_walk_sat(num_vars, clauses, walksat_pick, noise=noise, **kwargs)
+
+def probsat(num_vars, clauses, cb=2.38, eps=1.0, **kwargs):
+    return random_walk_sat(num_vars, clauses, probsat_pick, cb=cb, eps=eps, **kwargs)
+
+# Local-search engines by name, all called as solver(num_vars, clauses, **kwargs)
+SOLVERS = {
+    "hill": stochastic_hill_climbing,
+    "walksat": walksat,
+    "probsat": probsat,
+}
+
 if __name__ == "__main__":
+    # Usage: python main.py [hill|walksat|probsat] [file.cnf[.gz|.xz]] [--cache]
+    use_cache = "--cache" in sys.argv
+    args = [a for a in sys.argv[1:] if a != "--cache"]
+    solver = args[0] if args else "hill"
+    if solver not in SOLVERS:
+        print(f"Error: unknown solver '{solver}'. Choose one of: {', '.join(SOLVERS)}.")
+        sys.exit(1)
+
     # Create a dummy DIMACS file for demonstration
     cnf_content = """c This is a sample 3-SAT problem.
 p cnf 20 15
@@ -118,21 +314,33 @@ p cnf 20 15
 -13 14 -16 0
 17 -19 7 0
 """
-    filename = "sample.cnf"
-    with open(filename, "w") as f:
-        f.write(cnf_content)
+    if len(args) > 1:
+        filename = args[1]
+    else:
+        filename = "sample.cnf"
+        with open(filename, "w") as f:
+            f.write(cnf_content)
 
     print(f"Solving 3-SAT problem from {filename}...")
     
-    num_variables, sat_clauses = parse_dimacs(filename)
+    if len(args) > 1:
+        # User-supplied instances may be large: load them into flat clause storage
+        num_variables, sat_clauses = load_cnf(filename, use_cache)
+    else:
+        num_variables, sat_clauses = parse_dimacs(filename)
     
     if num_variables > 0:
-        solution, unsatisfied = stochastic_hill_climbing(
-            num_variables, 
-            sat_clauses,
-            max_restarts=20,
-            max_steps=500
-        )
+        if solver == "walksat":
+            solution, unsatisfied = walksat(num_variables, sat_clauses)
+        elif solver == "probsat":
+            solution, unsatisfied = probsat(num_variables, sat_clauses)
+        else:
+            solution, unsatisfied = stochastic_hill_climbing(
+                num_variables, 
+                sat_clauses,
+                max_restarts=20,
+                max_steps=500
+            )
         
         print("\n--- Results ---")
         if unsatisfied == 0:
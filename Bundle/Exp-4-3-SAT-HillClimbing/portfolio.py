@@ -0,0 +1,162 @@
+import contextlib
+import multiprocessing as mp
+import os
+import queue
+import random
+import sys
+import time
+from array import array
+from multiprocessing import shared_memory
+
+from cnf_store import FlatCNF, load_cnf
+from main import SOLVERS
+
+def share_clauses(clauses):
+    """
+    Copies the clause data once into two shared-memory blocks (CSR literals and
+    offsets) so workers can map it instead of receiving a pickled copy each.
+    """
+    if isinstance(clauses, FlatCNF):
+        literals, offsets = array("i", clauses.literals), array("q", clauses.offsets)
+    else:
+        literals, offsets = array("i"), array("q", [0])
+        for clause in clauses:
+            literals.extend(clause)
+            offsets.append(len(literals))
+    blocks = []
+    for buf in (literals, offsets):
+        data = buf.tobytes()
+        shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        shm.buf[:len(data)] = data
+        blocks.append(shm)
+    return blocks, (blocks[0].name, len(literals), blocks[1].name, len(offsets))
+
+def attach_clauses(num_vars, handle):
+    """
+    Worker side of share_clauses. Returns the attached blocks, the memoryviews
+    into them (to release before closing the blocks) and a zero-copy FlatCNF.
+    """
+    lit_name, num_literals, off_name, num_offsets = handle
+    blocks = (shared_memory.SharedMemory(name=lit_name), shared_memory.SharedMemory(name=off_name))
+    lit_bytes = blocks[0].buf[:4 * num_literals]
+    off_bytes = blocks[1].buf[:8 * num_offsets]
+    literals = lit_bytes.cast("i")
+    offsets = off_bytes.cast("q")
+    return blocks, (literals, offsets, lit_bytes, off_bytes), FlatCNF(num_vars, literals, offsets)
+
+def portfolio_worker(job_id, solver, seed, kwargs, num_vars, handle, results):
+    blocks, views, clauses = attach_clauses(num_vars, handle)
+    try:
+        random.seed(seed)
+        start_time = time.time()
+        # Solver progress output from many processes would interleave, so discard it
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            solution, unsatisfied = SOLVERS[solver](num_vars, clauses, **kwargs)
+        results.put((job_id, list(solution), unsatisfied, time.time() - start_time))
+    finally:
+        del clauses
+        for view in views:
+            view.release()
+        for shm in blocks:
+            shm.close()
+
+def restart_jobs(solver, count, base_seed=0, **kwargs):
+    """count independent runs of one solver with consecutive seeds."""
+    return [(solver, base_seed + i, kwargs) for i in range(count)]
+
+def run_portfolio(num_vars, clauses, jobs, workers=None, timeout_seconds=None):
+    """
+    Runs jobs = [(solver_name, seed, kwargs), ...] across up to `workers`
+    processes (default: one per CPU). As soon as one job reports 0 unsatisfied
+    clauses every other worker is terminated.
+    Returns (best_solution, unsatisfied, stats) where stats has one dict per
+    job with its solver, seed, status, unsatisfied count and elapsed time.
+    """
+    start_time = time.time()
+    workers = workers or os.cpu_count() or 1
+    blocks, handle = share_clauses(clauses)
+    results = mp.Queue()
+    stats = [{"job": i, "solver": solver, "seed": seed, "status": "pending", "unsatisfied": None, "seconds": None}
+             for i, (solver, seed, _) in enumerate(jobs)]
+    running = {}
+    next_job = 0
+    best_solution, best_fitness = [], float("inf")
+    try:
+        while next_job < len(jobs) or running:
+            # Keep every worker slot busy
+            while next_job < len(jobs) and len(running) < workers:
+                solver, seed, kwargs = jobs[next_job]
+                p = mp.Process(target=portfolio_worker,
+                               args=(next_job, solver, seed, kwargs, num_vars, handle, results), daemon=True)
+                p.start()
+                running[next_job] = p
+                stats[next_job]["status"] = "running"
+                stats[next_job]["started"] = time.time()
+                next_job += 1
+
+            if timeout_seconds is not None and time.time() - start_time >= timeout_seconds:
+                break
+            try:
+                job_id, solution, unsatisfied, seconds = results.get(timeout=0.1)
+            except queue.Empty:
+                # Reap workers that died without reporting
+                for job_id, p in list(running.items()):
+                    if not p.is_alive() and p.exitcode != 0:
+                        stats[job_id]["status"] = f"failed (exit code {p.exitcode})"
+                        del running[job_id]
+                continue
+
+            running.pop(job_id).join()
+            stats[job_id].update(status="finished", unsatisfied=unsatisfied, seconds=seconds)
+            if unsatisfied < best_fitness:
+                best_solution, best_fitness = solution, unsatisfied
+            if unsatisfied == 0:
+                stats[job_id]["status"] = "won"
+                break
+    finally:
+        now = time.time()
+        for job_id, p in running.items():
+            p.terminate()
+            p.join()
+            stats[job_id].update(status="cancelled", seconds=now - stats[job_id]["started"])
+        for s in stats:
+            s.pop("started", None)
+        results.close()
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+    return best_solution, best_fitness, stats
+
+if __name__ == "__main__":
+    # Usage: python portfolio.py file.cnf [workers] [restarts]
+    if len(sys.argv) < 2:
+        print("Usage: python portfolio.py file.cnf [workers] [restarts]")
+        sys.exit(1)
+    filename = sys.argv[1]
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    restarts = int(sys.argv[3]) if len(sys.argv) > 3 else 2 * workers
+
+    num_variables, sat_clauses = load_cnf(filename)
+    if num_variables > 0:
+        # Mix of engines and seeds; the first perfect assignment wins
+        jobs = (restart_jobs("walksat", restarts // 2, base_seed=0, max_tries=1)
+                + restart_jobs("probsat", restarts - restarts // 2, base_seed=restarts, max_tries=1))
+        start_time = time.time()
+        solution, unsatisfied, stats = run_portfolio(num_variables, sat_clauses, jobs, workers)
+        print(f"Portfolio finished in {time.time() - start_time:.2f} seconds with {workers} workers.")
+
+        print("\n--- Worker stats ---")
+        for s in stats:
+            seconds = "-" if s["seconds"] is None else f"{s['seconds']:.2f}s"
+            print(f"  #{s['job']:<3} {s['solver']:<8} seed={s['seed']:<4} {s['status']:<10} "
+                  f"unsatisfied={s['unsatisfied']} time={seconds}")
+
+        print("\n--- Results ---")
+        if unsatisfied == 0:
+            print("SATISFIABLE: A valid assignment was found.")
+        else:
+            print("UNSATISFIABLE or solution not found in time. This is the best assignment found.")
+
+        print(f"Unsatisfied clauses: {unsatisfied}")
+        readable_solution = {i + 1: val for i, val in enumerate(solution)}
+        print(f"Best variable assignments found: {readable_solution}")
@@ -0,0 +1,335 @@
+# Reproducible benchmark suite for the 8-puzzle and SAT solvers.
+# Workloads come from seeded generators: random solvable 8-puzzle boards bucketed
+# by optimal depth, and uniform random 3-SAT formulas at chosen clause/variable
+# ratios. Every (solver, instance) run happens in its own process under a time
+# limit and an address-space limit, so a runaway solver is killed instead of
+# stalling or swapping the machine. Aggregated results (solve rate, wall clock,
+# nodes/sec, flips/sec) are written to a JSON file that a later run can use as a
+# baseline to flag slowdowns.
+#
+# Usage:
+#   python benchmark.py                              # both suites, default sizes
+#   python benchmark.py --suite puzzle --per-bucket 10 --output base.json
+#   python benchmark.py --baseline base.json         # exit code 1 on regressions
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import multiprocessing as mp
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows; runs are then only time-limited
+    resource = None
+
+from exp1 import bfs, bidirectional_bfs
+from exp2 import iddfs
+from exp5 import astar
+from idastar import idastar, load_pdbs
+from puzzle8 import GOAL_CODE, is_solvable, neighbors, unpack
+from search_stats import SearchStats
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "Bundle", "Exp-1-8-Puzzle"))
+sys.path.insert(0, os.path.join(ROOT, "Bundle", "Exp-4-3-SAT-HillClimbing"))
+from best_first_search_8_puzzle import solve_puzzle
+from cdcl import cdcl
+from main import probsat, stochastic_hill_climbing, walksat
+
+# The VND solver's module is also called main.py, so load it under its own name
+_spec = importlib.util.spec_from_file_location("vnd_main", os.path.join(ROOT, "Bundle", "Exp-3-3-SAT", "main.py"))
+vnd_main = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(vnd_main)
+
+DEPTH_BUCKETS = ((1, 8), (9, 16), (17, 24), (25, 31))
+
+# --- Instance generators ---
+
+def puzzle_instances(seed, per_bucket, buckets=DEPTH_BUCKETS):
+    """
+    per_bucket distinct solvable boards for each (min_depth, max_depth) bucket,
+    as (bucket, board, optimal_depth) triples. Shallow boards come from short
+    random walks from GOAL, deep ones from random permutations.
+    """
+    rng = random.Random(f"puzzle-{seed}")
+    instances = []
+    for lo, hi in buckets:
+        found = {}
+        attempts = 0
+        while len(found) < per_bucket:
+            attempts += 1
+            if attempts > 10000 * per_bucket:
+                raise ValueError(f"could not generate boards with optimal depth {lo}-{hi}")
+            if rng.random() < 0.5:
+                # Random walk that never undoes its previous move
+                code, prev = GOAL_CODE, None
+                for _ in range(rng.randint(lo, hi)):
+                    code, prev = rng.choice([nb for nb in neighbors(code) if nb != prev]), code
+                board = unpack(code)
+            else:
+                board = list(range(9))
+                rng.shuffle(board)
+                board = tuple(board)
+                if not is_solvable(board):
+                    continue
+            if board in found:
+                continue
+            depth = len(bidirectional_bfs(board)) - 1
+            if lo <= depth <= hi:
+                found[board] = depth
+        instances.extend((f"depth {lo}-{hi}", board, depth) for board, depth in found.items())
+    return instances
+
+def random_3sat(num_vars, num_clauses, rng):
+    """Uniform random 3-SAT: each clause has 3 distinct variables with random signs."""
+    return [[v if rng.random() < 0.5 else -v for v in rng.sample(range(1, num_vars + 1), 3)]
+            for _ in range(num_clauses)]
+
+def sat_instances(seed, num_vars, ratios, count):
+    """count formulas per clause/variable ratio, as (group, (num_vars, clauses)) pairs."""
+    instances = []
+    for ratio in ratios:
+        rng = random.Random(f"sat-{seed}-{num_vars}-{ratio}")
+        for _ in range(count):
+            instances.append((f"n={num_vars} r={ratio}", (num_vars, random_3sat(num_vars, round(ratio * num_vars), rng))))
+    return instances
+
+# --- Solvers under test, all called as solver(instance, stats, time_limit) ---
+
+_pdbs = None
+
+def prepare_idastar():
+    """
+    Builds (first time) and maps the pattern databases in the parent, before any
+    run is timed. Forked children inherit the mapping; spawned ones reload the
+    saved files, which is only an mmap.
+    """
+    global _pdbs
+    if _pdbs is None:
+        _pdbs = load_pdbs(3, verbose=False)
+
+def run_idastar(board, stats, time_limit):
+    prepare_idastar()
+    return idastar(board, _pdbs, 3, stats)
+
+def run_best_first(board, stats, time_limit, weight=None):
+    path = solve_puzzle([board[r:r + 3] for r in range(0, 9, 3)], stats, weight)
+    return None if path is None else [sum(rows, ()) for rows in path]
+
+PUZZLE_SOLVERS = {
+    "bfs": lambda board, stats, time_limit: bfs(board, stats=stats),
+    "bidirectional": lambda board, stats, time_limit: bidirectional_bfs(board, stats),
+    "iddfs": lambda board, stats, time_limit: iddfs(board, max_depth=31, stats=stats, transposition=True),
+    "astar": lambda board, stats, time_limit: astar(board, stats),
+    "idastar": run_idastar,
+    "best-first": run_best_first,
+    "weighted-astar": lambda board, stats, time_limit: run_best_first(board, stats, time_limit, weight=2),
+}
+
+def local_search_status(result):
+    return "sat" if result[1] == 0 else "unknown"
+
+SAT_SOLVERS = {
+    "hill": lambda f, stats, time_limit: local_search_status(stochastic_hill_climbing(*f, stats=stats)),
+    "walksat": lambda f, stats, time_limit: local_search_status(walksat(*f, timeout_seconds=time_limit, stats=stats)),
+    "probsat": lambda f, stats, time_limit: local_search_status(probsat(*f, timeout_seconds=time_limit, stats=stats)),
+    "vnd": lambda f, stats, time_limit: local_search_status(
+        vnd_main.variable_neighborhood_descent(*f, k_max=2, timeout_seconds=time_limit)),
+    "cdcl": lambda f, stats, time_limit: {True: "sat", False: "unsat", None: "unknown"}[
+        cdcl(*f, timeout_seconds=time_limit, stats=stats)[1]],
+}
+
+SUITES = {"puzzle": PUZZLE_SOLVERS, "sat": SAT_SOLVERS}
+
+# --- Running under limits ---
+
+# Run statuses that count as solved (for SAT, a proof of unsatisfiability counts too)
+SOLVED = {"solved", "sat", "unsat"}
+
+def run_instance(suite, solver, instance, time_limit):
+    """Runs one solver on one instance in the current process; returns the raw measurements."""
+    stats = SearchStats(solver)
+    if suite == "puzzle":
+        board, optimal = instance
+        path = PUZZLE_SOLVERS[solver](board, stats, time_limit)
+        stats.finish()
+        moves = None if path is None else len(path) - 1
+        return {"status": "solved" if path is not None else "failed", "seconds": stats.seconds,
+                "expanded": stats.expanded, "moves": moves, "optimal": moves == optimal}
+    status = SAT_SOLVERS[solver](instance, stats, time_limit)
+    stats.finish()
+    return {"status": status, "seconds": stats.seconds, "flips": stats.counters.get("flips"),
+            "conflicts": stats.counters.get("conflicts")}
+
+def _child(conn, suite, solver, instance, seed, time_limit, memory_limit_mb):
+    if memory_limit_mb and resource is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    random.seed(seed)
+    try:
+        # Solver progress output would drown the report
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = run_instance(suite, solver, instance, time_limit)
+    except MemoryError:
+        result = {"status": "memory"}
+    conn.send(result)
+    conn.close()
+
+def run_limited(suite, solver, instance, seed, time_limit, memory_limit_mb):
+    """run_instance in a child process that is killed after time_limit seconds."""
+    receiver, sender = mp.Pipe(duplex=False)
+    p = mp.Process(target=_child, args=(sender, suite, solver, instance, seed, time_limit, memory_limit_mb), daemon=True)
+    start_time = time.perf_counter()
+    p.start()
+    sender.close()
+    # Solvers that honour the limit themselves get a little grace before being killed
+    if receiver.poll(time_limit + 1.0):
+        try:
+            result = receiver.recv()
+        except EOFError:
+            result = {"status": "crashed"}
+    else:
+        p.terminate()
+        result = {"status": "timeout", "seconds": time_limit}
+    p.join()
+    receiver.close()
+    if result["status"] == "crashed" and p.exitcode is not None and p.exitcode < 0:
+        result["status"] = f"killed (signal {-p.exitcode})"
+    result.setdefault("seconds", time.perf_counter() - start_time)
+    if result["status"] in SOLVED and result["seconds"] > time_limit:
+        # Finished inside the grace period: still over the limit
+        result["status"] = "timeout"
+    return result
+
+# --- Aggregation, reporting and baseline comparison ---
+
+def summarize(suite, group, solver, runs):
+    seconds = [r["seconds"] for r in runs]
+    solved = [r for r in runs if r["status"] in SOLVED]
+    row = {
+        "suite": suite,
+        "group": group,
+        "solver": solver,
+        "runs": len(runs),
+        "solved": len(solved),
+        "solve_rate": len(solved) / len(runs),
+        "mean_seconds": statistics.mean(seconds),
+        "median_seconds": statistics.median(seconds),
+        "statuses": {s: sum(r["status"] == s for r in runs) for s in sorted({r["status"] for r in runs})},
+    }
+    total_seconds = sum(r["seconds"] for r in runs if r["status"] in SOLVED | {"failed", "unknown"})
+    for counter, rate in (("expanded", "nodes_per_second"), ("flips", "flips_per_second"),
+                          ("conflicts", "conflicts_per_second")):
+        counted = [r[counter] for r in runs if r.get(counter) is not None]
+        if counted and total_seconds > 0:
+            row[rate] = sum(counted) / total_seconds
+    if suite == "puzzle" and solved:
+        row["optimal_rate"] = sum(r["optimal"] for r in solved) / len(solved)
+    return row
+
+def run_suites(args):
+    rows = []
+    suites = ["puzzle", "sat"] if args.suite == "all" else [args.suite]
+    for suite in suites:
+        if suite == "puzzle":
+            instances = [(group, (board, depth)) for group, board, depth in puzzle_instances(args.seed, args.per_bucket)]
+        else:
+            instances = sat_instances(args.seed, args.sat_vars, args.ratios, args.sat_instances)
+        groups = list(dict.fromkeys(group for group, _ in instances))
+        solvers = [s for s in SUITES[suite] if not args.solvers or s in args.solvers]
+        if "idastar" in solvers:
+            prepare_idastar()
+        for solver in solvers:
+            for group in groups:
+                runs = [run_limited(suite, solver, instance, args.seed + i, args.time_limit, args.memory_limit_mb)
+                        for i, (g, instance) in enumerate(instances) if g == group]
+                row = summarize(suite, group, solver, runs)
+                rows.append(row)
+                print(format_row(row), flush=True)
+    return rows
+
+def format_row(row):
+    rate = next((f"{row[k]:>12,.0f} {unit}" for k, unit in (("nodes_per_second", "nodes/s"), ("flips_per_second", "flips/s"),
+                                                          ("conflicts_per_second", "confl/s")) if k in row), "")
+    return (f"{row['suite']:<7} {row['solver']:<15} {row['group']:<16} solved {row['solved']:>3}/{row['runs']:<3} "
+            f"mean {row['mean_seconds']:8.3f}s  median {row['median_seconds']:8.3f}s  {rate}")
+
+def compare(rows, baseline_rows, tolerance, min_seconds=0.005):
+    """
+    Matches rows by (suite, group, solver) and returns the regressions: a lower
+    solve rate, or a mean time more than `tolerance` slower (ignoring differences
+    below min_seconds, which are timer noise).
+    """
+    base = {(r["suite"], r["group"], r["solver"]): r for r in baseline_rows}
+    regressions = []
+    for row in rows:
+        old = base.get((row["suite"], row["group"], row["solver"]))
+        if old is None:
+            continue
+        ratio = row["mean_seconds"] / old["mean_seconds"] if old["mean_seconds"] > 0 else 1.0
+        slower = ratio > 1 + tolerance and row["mean_seconds"] - old["mean_seconds"] > min_seconds
+        if slower or row["solve_rate"] < old["solve_rate"]:
+            regressions.append({"suite": row["suite"], "group": row["group"], "solver": row["solver"],
+                                "time_ratio": ratio, "solve_rate": row["solve_rate"],
+                                "baseline_solve_rate": old["solve_rate"]})
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the 8-puzzle and SAT solvers on seeded random instances.")
+    parser.add_argument("--suite", choices=["all", "puzzle", "sat"], default="all")
+    parser.add_argument("--solvers", nargs="*", help="only run these solvers (default: all of the suite)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--per-bucket", type=int, default=5, help="8-puzzle boards per optimal-depth bucket")
+    parser.add_argument("--sat-vars", type=int, default=50, help="variables per random 3-SAT formula")
+    parser.add_argument("--ratios", type=float, nargs="+", default=[3.0, 4.26], help="clause/variable ratios")
+    parser.add_argument("--sat-instances", type=int, default=5, help="formulas per ratio")
+    parser.add_argument("--time-limit", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--memory-limit-mb", type=int, default=2048, help="address-space limit per run (0 = none)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    rows = run_suites(args)
+    results = {
+        "meta": {
+            "seed": args.seed,
+            "per_bucket": args.per_bucket,
+            "sat_vars": args.sat_vars,
+            "ratios": args.ratios,
+            "sat_instances": args.sat_instances,
+            "time_limit": args.time_limit,
+            "memory_limit_mb": args.memory_limit_mb,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "seconds": time.time() - start_time,
+        },
+        "results": rows,
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output} ({time.time() - start_time:.1f} seconds).")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ("seed", "per_bucket", "sat_vars", "ratios", "sat_instances", "time_limit"):
+            if baseline["meta"].get(key) != results["meta"][key]:
+                print(f"Warning: baseline was run with {key}={baseline['meta'].get(key)}, not {results['meta'][key]}.")
+        regressions = compare(rows, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for r in regressions:
+                print(f"  {r['suite']:<7} {r['solver']:<15} {r['group']:<16} time x{r['time_ratio']:.2f}  "
+                      f"solve rate {r['baseline_solve_rate']:.0%} -> {r['solve_rate']:.0%}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}.")
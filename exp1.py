@@ -1,54 +1,110 @@
 # 8-Puzzle using Generate and Test (BFS)
+import sys
 from collections import deque
 
-GOAL = (1, 2, 3, 4, 5, 6, 7, 8, 0)
-
-def is_solvable(state):
-    arr = [x for x in state if x != 0]
-    inv = sum(arr[i] > arr[j] for i in range(len(arr)) for j in range(i + 1, len(arr)))
-    return inv % 2 == 0
-
-def neighbors(state):
-    idx = state.index(0)
-    r, c = divmod(idx, 3)
-    moves = []
-    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-        nr, nc = r + dr, c + dc
-        if 0 <= nr < 3 and 0 <= nc < 3:
-            nidx = nr * 3 + nc
-            s = list(state)
-            s[idx], s[nidx] = s[nidx], s[idx]
-            moves.append(tuple(s))
-    return moves
-
-def bfs(start):
+from puzzle8 import GOAL, GOAL_CODE, is_solvable, neighbors, pack, unpack_path
+from search_stats import SearchStats
+
+def bfs(start, bidirectional=False, stats=None):
+    # stats, if given, is a search_stats.SearchStats (or any object with its expand/phase methods)
+    if bidirectional:
+        return bidirectional_bfs(start, stats)
     if start == GOAL:
         return [start]
     if not is_solvable(start):
         return None
 
+    # Search on packed int states; only the final path is unpacked
+    start = pack(start)
     q = deque([start])
     parent = {start: None}
+    # Depths are only needed for the stats histogram
+    depth = {start: 0} if stats is not None else None
 
     while q:
         cur = q.popleft()
-        if cur == GOAL:
+        if cur == GOAL_CODE:
             path = []
             while cur is not None:
                 path.append(cur)
                 cur = parent[cur]
-            return path[::-1]
-        for nb in neighbors(cur):
+            return unpack_path(path[::-1])
+        children = neighbors(cur)
+        for nb in children:
             if nb not in parent:
                 parent[nb] = cur
                 q.append(nb)
+                if depth is not None:
+                    depth[nb] = depth[cur] + 1
+        if stats is not None:
+            stats.expand(depth[cur], len(children), len(q))
+    return None
+
+def bidirectional_bfs(start, stats=None):
+    """
+    Same result as bfs, but grows one frontier from start and one from GOAL,
+    always expanding a whole layer of the smaller one. The first state reached
+    by both sides lies on a shortest path, so the joined path is still optimal.
+    """
+    if start == GOAL:
+        return [start]
+    if not is_solvable(start):
+        return None
+
+    start = pack(start)
+    # parent_fwd points back towards start, parent_bwd points on towards GOAL
+    parent_fwd = {start: None}
+    parent_bwd = {GOAL_CODE: None}
+    frontier_fwd = [start]
+    frontier_bwd = [GOAL_CODE]
+    depth_fwd = depth_bwd = 0
+
+    while frontier_fwd and frontier_bwd:
+        if len(frontier_fwd) <= len(frontier_bwd):
+            frontier, parent, other, depth = frontier_fwd, parent_fwd, parent_bwd, depth_fwd
+        else:
+            frontier, parent, other, depth = frontier_bwd, parent_bwd, parent_fwd, depth_bwd
+        next_frontier = []
+        for cur in frontier:
+            children = neighbors(cur)
+            if stats is not None:
+                # Depth from whichever end this frontier grows from
+                stats.expand(depth, len(children), len(frontier_fwd) + len(frontier_bwd) + len(next_frontier))
+            for nb in children:
+                if nb in parent:
+                    continue
+                parent[nb] = cur
+                if nb in other:
+                    # Moves are reversible, so the goal side's parents are the next steps
+                    path = []
+                    node = nb
+                    while node is not None:
+                        path.append(node)
+                        node = parent_fwd[node]
+                    path.reverse()
+                    node = parent_bwd[nb]
+                    while node is not None:
+                        path.append(node)
+                        node = parent_bwd[node]
+                    return unpack_path(path)
+                next_frontier.append(nb)
+        if parent is parent_fwd:
+            frontier_fwd = next_frontier
+            depth_fwd += 1
+        else:
+            frontier_bwd = next_frontier
+            depth_bwd += 1
     return None
 
 if __name__ == "__main__":
     start = (1, 2, 3,
              4, 5, 6,
              0, 7, 8)
-    path = bfs(start)
+    # Usage: python exp1.py [--bidirectional] [--stats]   (--stats prints the search statistics as JSON)
+    stats = SearchStats("bfs") if "--stats" in sys.argv else None
+    path = bfs(start, bidirectional="--bidirectional" in sys.argv, stats=stats)
+    if stats is not None:
+        stats.finish().dump()
     if path is None:
         print("Unsolvable or no path found.")
     else:
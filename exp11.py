@@ -3,33 +3,63 @@
 # Place Kaggle's Iris.csv (or IRIS.csv) beside this script.
 # Kaggle columns: Id, SepalLengthCm, SepalWidthCm, PetalLengthCm, PetalWidthCm, Species
 
+import hashlib
+import io
+import itertools
+import json
+import multiprocessing as mp
 import os
+import pickle
+import queue
+import signal
+import socketserver
+import sqlite3
 import sys
+import threading
+import time
 import warnings
+from multiprocessing import shared_memory
 warnings.filterwarnings("ignore")
 
 import pandas as pd
 import numpy as np
 
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import RepeatedStratifiedKFold, train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import accuracy_score, f1_score
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.naive_bayes import GaussianNB
 
-def load_iris_dataframe():
-    """Load Iris from a local CSV. Tries common Kaggle filenames."""
+# Streaming mode (--stream): rows per CSV chunk, and every TEST_EVERY-th row of
+# each class goes to the test split (a deterministic stratified 80/20 split)
+CHUNK_ROWS = 100_000
+TEST_EVERY = 5
+
+ID_CANDIDATES = ["Id", "id", "ID", "index"]
+
+# SQLite mode (--sqlite): the Iris table of the bundled database, fetched in batches of FETCH_ROWS
+SQLITE_DB = "database.sqlite"
+SQLITE_TABLE = "Iris"
+FETCH_ROWS = 10_000
+
+def find_iris_csv():
+    """Path of the local Iris CSV. Tries common Kaggle filenames."""
     for name in ["Iris.csv", "IRIS.csv"]:
         if os.path.exists(name):
-            return pd.read_csv(name), name
+            return name
     raise FileNotFoundError(
         "Iris dataset not found. Put 'Iris.csv' or 'IRIS.csv' in the same folder as this script."
     )
 
-def split_X_y(df):
+def load_iris_dataframe():
+    """Load Iris from a local CSV. Tries common Kaggle filenames."""
+    name = find_iris_csv()
+    return pd.read_csv(name), name
+
+def detect_columns(df):
     """
-    Robustly select features and label.
-    Works for Kaggle (CamelCase) and other common variants.
+    Robustly pick the label column and the numeric feature columns.
+    Works for Kaggle (CamelCase) and other common variants; df can be a small sample.
     """
     # Candidate label columns (case-insensitive)
     label_candidates = ["Species", "species", "Class", "class", "variety"]
@@ -47,42 +77,613 @@ def split_X_y(df):
 
     # Drop obvious ID columns if present
     drop_cols = {label_col}
-    for c in ["Id", "id", "ID", "index"]:
+    for c in ID_CANDIDATES:
         if c in df.columns:
             drop_cols.add(c)
 
     # Features = numeric columns after dropping label/ID
-    X_df = df.drop(columns=list(drop_cols), errors="ignore")
-    X = X_df.select_dtypes(include=[np.number]).to_numpy()
-    if X.shape[1] == 0:
+    feature_cols = [c for c in df.select_dtypes(include=[np.number]).columns if c not in drop_cols]
+    if not feature_cols:
         raise ValueError("No numeric feature columns found after dropping label/ID.")
+    return label_col, feature_cols
+
+def split_X_y(df):
+    """
+    Robustly select features and label.
+    Works for Kaggle (CamelCase) and other common variants.
+    """
+    label_col, feature_cols = detect_columns(df)
+    X = df[feature_cols].to_numpy()
 
     # Encode labels
     y_raw = df[label_col].astype(str)
     le = LabelEncoder()
     y = le.fit_transform(y_raw)
 
-    return X, y, le, label_col, X_df.columns.tolist(), df
+    return X, y, le, label_col, feature_cols, df
+
+def csv_schema(path, chunksize=CHUNK_ROWS, sample_rows=1000):
+    """
+    Label column, feature columns and sorted class names of a CSV too big to load:
+    the columns are detected on the first rows, the classes in a label-only pass.
+    """
+    label_col, feature_cols = detect_columns(pd.read_csv(path, nrows=sample_rows))
+    classes = set()
+    for chunk in pd.read_csv(path, usecols=[label_col], dtype={label_col: "category"}, chunksize=chunksize):
+        classes.update(chunk[label_col].cat.categories)
+    return label_col, feature_cols, sorted(classes)
+
+def iter_csv_chunks(path, label_col, feature_cols, classes, chunksize=CHUNK_ROWS):
+    """
+    Yields (X float32, y codes, test mask) per chunk. The label is read as a
+    categorical with the fixed sorted classes, so its codes are the same
+    integers LabelEncoder would give. Rows with a missing label are skipped.
+    """
+    dtype = {c: np.float32 for c in feature_cols}
+    dtype[label_col] = pd.CategoricalDtype(classes)
+    seen = np.zeros(len(classes), dtype=np.int64)  # rows of each class so far
+    for chunk in pd.read_csv(path, usecols=feature_cols + [label_col], dtype=dtype, chunksize=chunksize):
+        y = chunk[label_col].cat.codes.to_numpy()
+        keep = y >= 0
+        X = chunk[feature_cols].to_numpy(dtype=np.float32)[keep]
+        y = y[keep].astype(np.int64)
+        # Position of each row within its class, counted over the whole file
+        position = seen[y] + pd.Series(y).groupby(y).cumcount().to_numpy()
+        seen += np.bincount(y, minlength=len(classes))
+        yield X, y, position % TEST_EVERY == TEST_EVERY - 1
+
+def cache_dir_for(path):
+    return path + ".cache"
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def write_cache_meta(meta_path, meta):
+    """Writes meta.json through a temporary file so readers never see a partial one."""
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+def save_feature_cache(path, X, y, le, label_col, feature_cols, cache_dir=None):
+    """
+    Writes the parsed features (X.npy), encoded labels (y.npy) and the class list
+    and column metadata (meta.json), tagged with the source's size, mtime and
+    SHA-256. meta.json is written last, so a half-written cache is never used.
+    """
+    cache_dir = cache_dir or cache_dir_for(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    st = os.stat(path)
+    meta = {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": file_sha256(path),
+        "label_col": label_col,
+        "feature_cols": list(feature_cols),
+        "classes": [str(c) for c in le.classes_],
+    }
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    np.save(os.path.join(cache_dir, "X.npy"), np.ascontiguousarray(X))
+    np.save(os.path.join(cache_dir, "y.npy"), np.ascontiguousarray(y))
+    write_cache_meta(meta_path, meta)
+
+def load_feature_cache(path, cache_dir=None):
+    """
+    Memory-maps a cache written by save_feature_cache; returns
+    (X, y, le, label_col, feature_cols) or None if it is missing or stale.
+    An unchanged size and mtime is trusted; otherwise the source is hashed, and
+    a cache whose hash still matches (the file was only touched) is kept.
+    """
+    cache_dir = cache_dir or cache_dir_for(path)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    st = os.stat(path)
+    if st.st_size != meta["size"]:
+        return None
+    if st.st_mtime_ns != meta["mtime_ns"]:
+        if file_sha256(path) != meta["sha256"]:
+            return None
+        meta["mtime_ns"] = st.st_mtime_ns
+        write_cache_meta(meta_path, meta)
+    try:
+        X = np.load(os.path.join(cache_dir, "X.npy"), mmap_mode="r")
+        y = np.load(os.path.join(cache_dir, "y.npy"), mmap_mode="r")
+    except (FileNotFoundError, ValueError):
+        return None
+    le = LabelEncoder()
+    le.classes_ = np.array(meta["classes"], dtype=object)
+    return X, y, le, meta["label_col"], meta["feature_cols"]
+
+def load_csv_cached(path):
+    """
+    split_X_y on a CSV through the feature cache: a valid cache is mapped zero-copy,
+    otherwise the CSV is parsed and the cache rebuilt.
+    Returns X, y, le, label_col, feature_cols and whether the cache was used.
+    """
+    cached = load_feature_cache(path)
+    if cached is not None:
+        return (*cached, True)
+    X, y, le, label_col, feature_cols, _ = split_X_y(pd.read_csv(path))
+    save_feature_cache(path, X, y, le, label_col, feature_cols)
+    return X, y, le, label_col, feature_cols, False
+
+def quote_ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def load_sqlite_split(path=SQLITE_DB, table=SQLITE_TABLE, fetch_rows=FETCH_ROWS):
+    """
+    Stratified 80/20 split read straight from SQLite. The label and feature columns
+    are detected on the first rows with the split_X_y rules; only those columns are
+    selected. Within each class, rows are ordered by a hash of the ID column (rowid
+    if there is none) and every TEST_EVERY-th one goes to the test split, all in SQL.
+    Labels are encoded in SQL with the sorted class list, like LabelEncoder, and rows
+    are fetched in batches into preallocated arrays.
+    Returns X_tr, X_te, y_tr, y_te, le, label_col, feature_cols.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"SQLite database '{path}' not found.")
+    conn = sqlite3.connect(path)
+    try:
+        tbl = quote_ident(table)
+        sample = pd.read_sql_query(f"SELECT * FROM {tbl} LIMIT 1000", conn)
+        label_col, feature_cols = detect_columns(sample)
+        id_col = next((c for c in ID_CANDIDATES if c in sample.columns), "rowid")
+        label = quote_ident(label_col)
+        features = ", ".join(quote_ident(c) for c in feature_cols)
+
+        counts = conn.execute(
+            f"SELECT CAST({label} AS TEXT), COUNT(*) FROM {tbl} WHERE {label} IS NOT NULL "
+            f"GROUP BY 1 ORDER BY 1").fetchall()
+        classes = [c for c, _ in counts]
+        n_test = sum(n // TEST_EVERY for _, n in counts)
+        n_train = sum(n for _, n in counts) - n_test
+
+        # Knuth's multiplicative hash of the ID fixes a deterministic pseudo-random order
+        ranked = (
+            f"WITH classes AS (SELECT label, ROW_NUMBER() OVER (ORDER BY label) - 1 AS code "
+            f"FROM (SELECT DISTINCT CAST({label} AS TEXT) AS label FROM {tbl} WHERE {label} IS NOT NULL)), "
+            f"ranked AS (SELECT {features}, classes.code AS code, ROW_NUMBER() OVER ("
+            f"PARTITION BY classes.code ORDER BY ({quote_ident(id_col)} * 2654435761) % 4294967296, "
+            f"{quote_ident(id_col)}) AS r FROM {tbl} JOIN classes ON CAST({tbl}.{label} AS TEXT) = classes.label) "
+            f"SELECT {features}, code FROM ranked WHERE r % {TEST_EVERY} {{}} 0")
+
+        def fetch(op, n):
+            X = np.empty((n, len(feature_cols)), dtype=np.float64)
+            y = np.empty(n, dtype=np.int64)
+            cur = conn.execute(ranked.format(op))
+            i = 0
+            while True:
+                rows = cur.fetchmany(fetch_rows)
+                if not rows:
+                    break
+                batch = np.array(rows, dtype=np.float64)
+                X[i:i + len(rows)] = batch[:, :-1]
+                y[i:i + len(rows)] = batch[:, -1]
+                i += len(rows)
+            return X[:i], y[:i]
+
+        X_tr, y_tr = fetch("!=", n_train)
+        X_te, y_te = fetch("=", n_test)
+    finally:
+        conn.close()
+    le = LabelEncoder()
+    le.classes_ = np.array(classes, dtype=object)
+    return X_tr, X_te, y_tr, y_te, le, label_col, feature_cols
+
+def metrics_from_confusion(cm):
+    """Accuracy and macro F1 (as sklearn computes them) from a confusion matrix."""
+    tp = np.diag(cm).astype(np.float64)
+    fp = cm.sum(axis=0) - tp
+    fn = cm.sum(axis=1) - tp
+    denom = 2 * tp + fp + fn
+    f1 = np.divide(2 * tp, denom, out=np.zeros_like(tp), where=denom > 0)
+    present = (cm.sum(axis=0) + cm.sum(axis=1)) > 0  # labels seen in y_true or y_pred
+    total = cm.sum()
+    return (float(tp.sum() / total) if total else 0.0), (float(f1[present].mean()) if present.any() else 0.0)
+
+def stream_evaluate(path, chunksize=CHUNK_ROWS):
+    """
+    Out-of-core GaussianNB: one pass fits it chunk by chunk with partial_fit, a
+    second pass predicts and fills train/test confusion matrices. Memory stays
+    bounded by the chunk size whatever the file size.
+    """
+    label_col, feature_cols, classes = csv_schema(path, chunksize)
+    codes = np.arange(len(classes))
+    nb = GaussianNB()
+    for X, y, test in iter_csv_chunks(path, label_col, feature_cols, classes, chunksize):
+        if (~test).any():
+            nb.partial_fit(X[~test], y[~test], classes=codes)
+
+    k = len(classes)
+    cm = {"train": np.zeros(k * k, dtype=np.int64), "test": np.zeros(k * k, dtype=np.int64)}
+    for X, y, test in iter_csv_chunks(path, label_col, feature_cols, classes, chunksize):
+        cells = y * k + nb.predict(X)
+        cm["train"] += np.bincount(cells[~test], minlength=k * k)
+        cm["test"] += np.bincount(cells[test], minlength=k * k)
+    res = {}
+    for split in ("train", "test"):
+        res[f"{split}_acc"], res[f"{split}_f1"] = metrics_from_confusion(cm[split].reshape(k, k))
+    sizes = (int(cm["train"].sum()), int(cm["test"].sum()))
+    return res, label_col, feature_cols, classes, sizes
 
 def evaluate(model, X_train, y_train, X_test, y_test):
+    start = time.perf_counter()
     model.fit(X_train, y_train)
+    fitted = time.perf_counter()
     ytr = model.predict(X_train)
     yte = model.predict(X_test)
+    predicted = time.perf_counter()
     return {
         "train_acc": accuracy_score(y_train, ytr),
         "train_f1":  f1_score(y_train, ytr, average="macro"),
         "test_acc":  accuracy_score(y_test, yte),
         "test_f1":   f1_score(y_test, yte, average="macro"),
+        "fit_seconds": fitted - start,
+        "predict_seconds": predicted - fitted,
     }
 
+# Cross-validation mode (--cv): every (model, params) pair of the grids is scored on
+# CV_REPEATS x CV_FOLDS repeated stratified folds, one pool job per (model, params, fold)
+CV_FOLDS = 5
+CV_REPEATS = 3
+PARAM_GRIDS = {
+    "DecisionTree": (DecisionTreeClassifier, {"criterion": ["gini", "entropy"], "max_depth": [None, 2, 3, 5]}),
+    "GaussianNB": (GaussianNB, {"var_smoothing": [1e-9, 1e-7, 1e-5, 1e-3]}),
+}
+
+def share_array(arr):
+    """Copies arr into a new shared memory block; returns the block and its (name, shape, dtype) descriptor."""
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+# Per-worker views of the shared X, y and fold table, set up once by init_cv_worker
+_shared = {}
+
+def init_cv_worker(descriptors):
+    warnings.filterwarnings("ignore")
+    for key, (name, shape, dtype) in descriptors.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _shared[key] = (shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf))
+
+def run_cv_job(job):
+    """Worker: fits and scores one (model, params) on one fold of one repeat."""
+    model_name, params, repeat, fold = job
+    X, y, folds = _shared["X"][1], _shared["y"][1], _shared["folds"][1]
+    test = folds[repeat] == fold
+    cls, _ = PARAM_GRIDS[model_name]
+    extra = {"random_state": 42} if cls is DecisionTreeClassifier else {}
+    res = evaluate(cls(**params, **extra), X[~test], y[~test], X[test], y[test])
+    res.update(model=model_name, params=json.dumps(params), repeat=repeat, fold=fold)
+    return res
+
+def cv_jobs(grids=PARAM_GRIDS, repeats=CV_REPEATS, folds=CV_FOLDS):
+    for model_name, (_, grid) in grids.items():
+        keys = list(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            for repeat in range(repeats):
+                for fold in range(folds):
+                    yield model_name, dict(zip(keys, values)), repeat, fold
+
+def cross_validate_grid(X, y, workers=None, folds=CV_FOLDS, repeats=CV_REPEATS, seed=42):
+    """
+    Runs every cv_jobs() job across a process pool. X, y and the fold table
+    (folds[repeat, row] = test fold of the row) are placed in shared memory once;
+    workers map them instead of receiving pickled copies.
+    Returns one result dict per job (evaluate() metrics and timings).
+    """
+    fold_table = np.empty((repeats, len(y)), dtype=np.int8)
+    splitter = RepeatedStratifiedKFold(n_splits=folds, n_repeats=repeats, random_state=seed)
+    for i, (_, test_idx) in enumerate(splitter.split(X, y)):
+        fold_table[i // folds, test_idx] = i % folds
+
+    blocks = []
+    descriptors = {}
+    try:
+        for key, arr in (("X", np.ascontiguousarray(X)), ("y", np.ascontiguousarray(y)), ("folds", fold_table)):
+            shm, descriptors[key] = share_array(arr)
+            blocks.append(shm)
+        workers = workers or os.cpu_count() or 1
+        with mp.Pool(workers, initializer=init_cv_worker, initargs=(descriptors,)) as pool:
+            return list(pool.imap_unordered(run_cv_job, cv_jobs(repeats=repeats, folds=folds), chunksize=4))
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+def summarize_cv(results):
+    """Mean/std of every metric per (model, params), best mean test F1 first."""
+    df = pd.DataFrame(results)
+    metrics = ["test_f1", "test_acc", "train_f1", "fit_seconds", "predict_seconds"]
+    table = df.groupby(["model", "params"])[metrics].agg(["mean", "std"])
+    return table.sort_values(("test_f1", "mean"), ascending=False)
+
+# Serving mode (--serve): models saved by --save-models answer JSON lines on stdin or a
+# localhost socket; rows are predicted in micro-batches of up to MAX_BATCH rows, waiting
+# at most MAX_WAIT_MS after the first row of a batch for more to arrive
+MODEL_PATH = "iris_models.pkl"
+MAX_BATCH = 64
+MAX_WAIT_MS = 2.0
+
+def save_models(path, models, le, label_col, feature_cols):
+    with open(path, "wb") as f:
+        pickle.dump({"models": models, "label_encoder": le,
+                     "label_col": label_col, "feature_cols": list(feature_cols)}, f)
+
+def load_models(path=MODEL_PATH):
+    """The dict written by save_models. Only load model files you created yourself (pickle)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No saved models at '{path}'. Train once with --save-models first.")
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+def request_features(req, feature_cols):
+    """
+    Feature list of one parsed request: {"id": ..., "features": [...] or
+    {column: value}} or a bare JSON list of feature values.
+    """
+    if isinstance(req, dict):
+        req = req["features"]
+    if isinstance(req, dict):
+        req = [req[c] for c in feature_cols]
+    if not isinstance(req, (list, tuple)):
+        raise TypeError(f"features must be a JSON list or object, got {type(req).__name__}")
+    if len(req) != len(feature_cols):
+        raise ValueError(f"expected {len(feature_cols)} features, got {len(req)}")
+    return [float(v) for v in req]
+
+class JsonLinesReplies:
+    """
+    Response stream of one client; the batcher writes to it and flushes once per
+    batch, and the client's reader thread writes error replies. The lock keeps
+    the two from using the (not thread-safe) text stream at the same time.
+    """
+    def __init__(self, file):
+        self.file = file
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.done = threading.Condition()
+
+    def send(self, rid, **fields):
+        line = json.dumps({"id": rid, **fields}) + "\n"
+        with self.lock:
+            self.file.write(line)
+
+    def flush(self):
+        with self.lock:
+            self.file.flush()
+
+    def wait(self):
+        """Blocks until every submitted row of this client has been answered."""
+        with self.done:
+            self.done.wait_for(lambda: self.pending == 0)
+
+class MicroBatcher:
+    """
+    Collects rows from any number of clients and predicts them with one predict()
+    call per batch: a batch closes when it holds max_batch rows or max_wait
+    seconds after its first row arrived. Records each row's latency from arrival
+    to reply.
+    """
+    def __init__(self, model, le, n_features, max_batch=MAX_BATCH, max_wait=MAX_WAIT_MS / 1000):
+        self.model = model
+        self.classes = np.asarray(le.classes_)
+        self.X = np.empty((max_batch, n_features))
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.latencies = []
+        self.batches = 0
+        self.first_arrival = None
+        self.last_reply = None
+
+    def submit(self, rid, features, replies):
+        with replies.done:
+            replies.pending += 1
+        self.queue.put((time.perf_counter(), rid, features, replies))
+
+    def close(self):
+        self.queue.put(None)
+
+    def run(self):
+        """Batching loop; returns after close() once everything before it is answered."""
+        closing = False
+        while not closing:
+            item = self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = item[0] + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            n = len(batch)
+            for i, (_, _, features, _) in enumerate(batch):
+                self.X[i] = features
+            labels = self.classes[self.model.predict(self.X[:n])]
+            for (_, rid, _, replies), label in zip(batch, labels):
+                replies.send(rid, label=str(label))
+            now = time.perf_counter()
+            for replies in {id(r): r for _, _, _, r in batch}.values():
+                replies.flush()
+                with replies.done:
+                    replies.pending -= sum(r is replies for _, _, _, r in batch)
+                    replies.done.notify_all()
+            self.latencies.extend(now - t for t, _, _, _ in batch)
+            self.batches += 1
+            if self.first_arrival is None:
+                self.first_arrival = batch[0][0]
+            self.last_reply = now
+
+    def report(self):
+        """Rows, batches, mean batch size, p50/p99 latency (ms) and throughput (rows/s)."""
+        rows = len(self.latencies)
+        if not rows:
+            return {"rows": 0, "batches": 0}
+        lat = np.array(self.latencies) * 1000
+        elapsed = self.last_reply - self.first_arrival
+        return {
+            "rows": rows,
+            "batches": self.batches,
+            "mean_batch": rows / self.batches,
+            "p50_ms": float(np.percentile(lat, 50)),
+            "p99_ms": float(np.percentile(lat, 99)),
+            "rows_per_second": rows / elapsed if elapsed > 0 else float("inf"),
+        }
+
+def feed_lines(lines, batcher, replies, feature_cols):
+    """Submits every request line; malformed ones are answered right away with an error."""
+    for line in lines:
+        if not line.strip():
+            continue
+        rid = None
+        try:
+            req = json.loads(line)
+            rid = req.get("id") if isinstance(req, dict) else None
+            features = request_features(req, feature_cols)
+        except (ValueError, KeyError, TypeError) as e:
+            replies.send(rid, error=str(e))
+            replies.flush()
+            continue
+        batcher.submit(rid, features, replies)
+
+def serve(bundle, model_name="DecisionTree", port=None, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+    """
+    Answers JSON request lines with {"id": ..., "label": ...} lines: from stdin to
+    stdout until EOF, or from any number of clients of a localhost TCP port until
+    interrupted (Ctrl-C or SIGTERM). Returns the MicroBatcher report.
+    """
+    feature_cols = bundle["feature_cols"]
+    batcher = MicroBatcher(bundle["models"][model_name], bundle["label_encoder"], len(feature_cols),
+                           max_batch, max_wait_ms / 1000)
+    worker = threading.Thread(target=batcher.run, daemon=True)
+    worker.start()
+    if port is None:
+        replies = JsonLinesReplies(sys.stdout)
+        feed_lines(sys.stdin, batcher, replies, feature_cols)
+    else:
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                replies = JsonLinesReplies(io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=False))
+                feed_lines(io.TextIOWrapper(self.rfile, encoding="utf-8"), batcher, replies, feature_cols)
+                replies.wait()
+
+        def stop(signum, frame):
+            raise KeyboardInterrupt
+
+        signal.signal(signal.SIGTERM, stop)  # stop like Ctrl-C so the report still gets printed
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        with socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler) as server:
+            server.daemon_threads = True
+            print(f"Serving {model_name} on 127.0.0.1:{port} (Ctrl-C or SIGTERM to stop)", file=sys.stderr)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+    batcher.close()
+    worker.join()
+    return batcher.report()
+
+def fmt(res):
+    return (f"Train Acc: {res['train_acc']:.4f} | Train F1: {res['train_f1']:.4f} | "
+            f"Test Acc: {res['test_acc']:.4f} | Test F1: {res['test_f1']:.4f}")
+
+def main_stream(chunksize):
+    fname = find_iris_csv()
+    nb_res, label_col, feature_names, classes, (n_train, n_test) = stream_evaluate(fname, chunksize)
+
+    print("=== Iris (streaming): Naive Bayes ===")
+    print(f"Loaded file           : {fname} (chunks of {chunksize} rows)")
+    print(f"Detected label column : {label_col}")
+    print(f"Feature columns       : {feature_names}")
+    print(f"Train size: {n_train} | Test size: {n_test} | Classes: {classes}\n")
+
+    print("Decision Tree   -> skipped (needs the whole table in memory)")
+    print("Naive Bayes     ->", fmt(nb_res))
+
+def main_cv(workers):
+    fname = find_iris_csv()
+    if "--cache" in sys.argv:
+        X, y, le, label_col, feature_names, _ = load_csv_cached(fname)
+    else:
+        X, y, le, label_col, feature_names, _ = split_X_y(pd.read_csv(fname))
+
+    start_time = time.perf_counter()
+    results = cross_validate_grid(X, y, workers)
+    elapsed = time.perf_counter() - start_time
+    table = summarize_cv(results)
+
+    print("=== Iris: cross-validated model selection ===")
+    print(f"Loaded file           : {fname}")
+    print(f"Detected label column : {label_col}")
+    print(f"Feature columns       : {feature_names}")
+    print(f"Rows: {len(y)} | {CV_REPEATS} x {CV_FOLDS}-fold stratified CV | "
+          f"{len(results)} jobs in {elapsed:.2f} seconds\n")
+
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.max_colwidth", 60):
+        print(table.round(4).to_string())
+
+def option(flag, default=None, cast=str):
+    """The command-line value after flag; default if the flag is absent or has no value."""
+    if flag not in sys.argv:
+        return default
+    i = sys.argv.index(flag) + 1
+    if i < len(sys.argv) and not sys.argv[i].startswith("--"):
+        return cast(sys.argv[i])
+    return default
+
+def main_serve(path):
+    bundle = load_models(path)
+    model_name = option("--model", "DecisionTree")
+    if model_name not in bundle["models"]:
+        raise ValueError(f"Unknown model '{model_name}' (saved: {', '.join(bundle['models'])})")
+    report = serve(bundle, model_name, option("--port", None, int),
+                   option("--max-batch", MAX_BATCH, int), option("--max-wait-ms", MAX_WAIT_MS, float))
+    if report["rows"]:
+        print(f"Served {report['rows']} rows in {report['batches']} batches "
+              f"(mean batch {report['mean_batch']:.1f}) | p50 {report['p50_ms']:.3f} ms | "
+              f"p99 {report['p99_ms']:.3f} ms | {report['rows_per_second']:.0f} rows/s", file=sys.stderr)
+
 def main():
-    df, fname = load_iris_dataframe()
-    X, y, le, label_col, feature_names, _ = split_X_y(df)
+    if "--serve" in sys.argv:
+        return main_serve(option("--serve", MODEL_PATH))
+    if "--cv" in sys.argv:
+        return main_cv(option("--workers", None, int))
+    if "--stream" in sys.argv:
+        return main_stream(option("--chunksize", CHUNK_ROWS, int))
 
-    # Stratified split for fair class balance
-    X_tr, X_te, y_tr, y_te = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    if "--sqlite" in sys.argv:
+        fname = option("--sqlite", SQLITE_DB)
+        X_tr, X_te, y_tr, y_te, le, label_col, feature_names = load_sqlite_split(fname)
+        fname = f"{fname} (table {SQLITE_TABLE})"
+    else:
+        if "--cache" in sys.argv:
+            fname = find_iris_csv()
+            X, y, le, label_col, feature_names, hit = load_csv_cached(fname)
+            fname += " (from cache)" if hit else " (cache rebuilt)"
+        else:
+            df, fname = load_iris_dataframe()
+            X, y, le, label_col, feature_names, _ = split_X_y(df)
+
+        # Stratified split for fair class balance
+        X_tr, X_te, y_tr, y_te = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
 
     dt = DecisionTreeClassifier(criterion="entropy", random_state=42)
     nb = GaussianNB()
@@ -91,10 +692,6 @@ def main():
     nb_res = evaluate(nb, X_tr, y_tr, X_te, y_te)
 
     # Pretty print
-    def fmt(res):
-        return (f"Train Acc: {res['train_acc']:.4f} | Train F1: {res['train_f1']:.4f} | "
-                f"Test Acc: {res['test_acc']:.4f} | Test F1: {res['test_f1']:.4f}")
-
     print("=== Iris: Decision Tree vs Naive Bayes ===")
     print(f"Loaded file           : {fname}")
     print(f"Detected label column : {label_col}")
@@ -104,7 +701,16 @@ def main():
     print("Decision Tree   ->", fmt(dt_res))
     print("Naive Bayes     ->", fmt(nb_res))
 
+    if "--save-models" in sys.argv:
+        path = option("--save-models", MODEL_PATH)
+        save_models(path, {"DecisionTree": dt, "GaussianNB": nb}, le, label_col, feature_names)
+        print(f"\nSaved models to {path}")
+
 if __name__ == "__main__":
+    # Usage: python exp11.py [--stream [--chunksize N] | --sqlite [database] | --cv [--workers N]] [--cache]
+    #                        [--save-models [file]]
+    #        python exp11.py --serve [file] [--model DecisionTree|GaussianNB] [--port P]
+    #                        [--max-batch N] [--max-wait-ms MS]
     try:
         main()
     except Exception as e:
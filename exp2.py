@@ -1,47 +1,72 @@
 # 8-Puzzle using DFID (Iterative Deepening DFS)
-GOAL = (1,2,3,4,5,6,7,8,0)
+import sys
 
-def is_solvable(state):
-    arr = [x for x in state if x != 0]
-    inv = sum(arr[i] > arr[j] for i in range(len(arr)) for j in range(i+1, len(arr)))
-    return inv % 2 == 0
+from puzzle8 import BLANK_SHIFT, GOAL, GOAL_CODE, MOVE_TABLE, is_solvable, pack, unpack_path
+from search_stats import SearchStats
 
-def neighbors(state):
-    idx = state.index(0)
-    r, c = divmod(idx, 3)
-    for dr, dc in [(-1,0),(1,0),(0,-1),(0,1)]:
-        nr, nc = r+dr, c+dc
-        if 0 <= nr < 3 and 0 <= nc < 3:
-            nidx = nr*3+nc
-            s = list(state)
-            s[idx], s[nidx] = s[nidx], s[idx]
-            yield tuple(s)
-
-def dls(node, depth, visited):
-    if node == GOAL: return [node]
-    if depth == 0: return None
-    visited.add(node)
-    for nb in neighbors(node):
-        if nb not in visited:
-            res = dls(nb, depth-1, visited)
-            if res is not None:
-                return [node] + res
-    visited.remove(node)
+def dls(start, limit, stats=None, table=None, table_size=None):
+    """
+    Depth-limited DFS with an explicit stack instead of recursion. Only the
+    current branch of packed states (see puzzle8) is kept, plus the index of
+    the next move to try at each depth. A move that puts the blank back where
+    it just came from is skipped.
+    table, if given, maps state -> (shallowest depth seen, limit of that
+    iteration) and is kept across iterations: a state reached deeper than
+    before is pruned, since the shallower visit covers everything below it.
+    At most table_size states are recorded.
+    Returns the path from start to GOAL as packed states, or None.
+    """
+    path = [start]
+    next_move = [0]
+    while path:
+        node = path[-1]
+        if node == GOAL_CODE:
+            return path
+        depth = len(path) - 1
+        moves = MOVE_TABLE[node >> BLANK_SHIFT]
+        i = next_move[-1]
+        if depth == limit or i == len(moves):
+            path.pop()
+            next_move.pop()
+            continue
+        if i == 0 and stats is not None:
+            stats.expand(depth, len(moves), len(path))
+        next_move[-1] = i + 1
+        shift, mult, delta = moves[i]
+        if depth and shift == 4 * (path[-2] >> BLANK_SHIFT):
+            continue  # inverse of the previous move
+        child = node + ((node >> shift) & 15) * mult + delta
+        if table is not None:
+            seen = table.get(child)
+            if seen is not None and (depth + 1 > seen[0] or (depth + 1 == seen[0] and seen[1] == limit)):
+                continue
+            if seen is not None or table_size is None or len(table) < table_size:
+                table[child] = (depth + 1, limit)
+        path.append(child)
+        next_move.append(0)
     return None
 
-def iddfs(start, max_depth=40):
+def iddfs(start, max_depth=40, stats=None, transposition=False, table_size=None):
+    # stats, if given, is a search_stats.SearchStats; each iteration is timed as its own phase
+    # transposition=True keeps a table of the shallowest depth of each state across iterations
     if start == GOAL: return [start]
     if not is_solvable(start): return None
+    start = pack(start)
+    table = {start: (0, None)} if transposition else None
     for depth in range(max_depth+1):
-        visited = set()
-        res = dls(start, depth, visited)
+        if stats is not None: stats.phase(f"depth {depth}")
+        res = dls(start, depth, stats, table, table_size)
         if res is not None:
-            return res
+            return unpack_path(res)
     return None
 
 if __name__ == "__main__":
+    # Usage: python exp2.py [--transposition] [--stats]   (--stats prints the search statistics as JSON)
     start = (1,2,3,4,5,6,0,7,8)
-    path = iddfs(start)
+    stats = SearchStats("iddfs") if "--stats" in sys.argv else None
+    path = iddfs(start, transposition="--transposition" in sys.argv, stats=stats)
+    if stats is not None:
+        stats.finish().dump()
     if path is None:
         print("Unsolvable or depth limit exceeded.")
     else:
@@ -1,66 +1,235 @@
 # 8-Puzzle A* (Manhattan distance)
 import heapq
+import sys
 
-GOAL = (1,2,3,4,5,6,7,8,0)
-goal_pos = {v:i for i,v in enumerate(GOAL)}
+from puzzle8 import GOAL, GOAL_CODE, is_solvable, manhattan, neighbors, neighbors_h, pack, unpack_path
+from search_stats import SearchStats
 
-def is_solvable(state):
-    arr = [x for x in state if x != 0]
-    inv = sum(arr[i] > arr[j] for i in range(len(arr)) for j in range(i+1, len(arr)))
-    return inv % 2 == 0
+# sma_star gives up once the lowest f has not risen for STALL_FACTOR * max_nodes expansions
+STALL_FACTOR = 100
 
-def manhattan(state):
-    dist = 0
-    for i, v in enumerate(state):
-        if v == 0: continue
-        gi = goal_pos[v]
-        r1,c1 = divmod(i,3)
-        r2,c2 = divmod(gi,3)
-        dist += abs(r1-r2)+abs(c1-c2)
-    return dist
-
-def neighbors(state):
-    idx = state.index(0)
-    r,c = divmod(idx,3)
-    for dr,dc in [(-1,0),(1,0),(0,-1),(0,1)]:
-        nr,nc = r+dr,c+dc
-        if 0<=nr<3 and 0<=nc<3:
-            nidx = nr*3+nc
-            s = list(state)
-            s[idx], s[nidx] = s[nidx], s[idx]
-            yield tuple(s)
-
-def astar(start):
+def astar(start, stats=None, max_nodes=None):
+    # stats, if given, is a search_stats.SearchStats (or any object with its expand/phase methods)
+    # max_nodes caps the number of stored states (see sma_star)
+    if max_nodes is not None: return sma_star(start, max_nodes, stats)
     if start == GOAL: return [start]
     if not is_solvable(start): return None
+    start = pack(start)
     openh = []
     g = {start:0}
     parent = {start:None}
-    heapq.heappush(openh, (manhattan(start), 0, start))
+    # Each entry carries the node's h so children update it in O(1) (see puzzle8.neighbors_h)
+    h0 = manhattan(start)
+    heapq.heappush(openh, (h0, 0, start, h0))
     closed = set()
     while openh:
-        f, gc, cur = heapq.heappop(openh)
+        f, gc, cur, h = heapq.heappop(openh)
         if cur in closed: continue
         closed.add(cur)
-        if cur == GOAL:
+        if cur == GOAL_CODE:
             path = []
             while cur is not None:
                 path.append(cur)
                 cur = parent[cur]
-            return path[::-1]
-        for nb in neighbors(cur):
+            return unpack_path(path[::-1])
+        children = neighbors_h(cur, h)
+        for nb, nh in children:
+            if nb in closed: continue  # already expanded at a g that cannot be beaten
             ng = g[cur] + 1
             if nb not in g or ng < g[nb]:
                 g[nb] = ng
                 parent[nb] = cur
-                heapq.heappush(openh, (ng + manhattan(nb), ng, nb))
+                heapq.heappush(openh, (ng + nh, ng, nb, nh))
+        if stats is not None: stats.expand(gc, len(children), len(openh))
+    return None
+
+def sma_star(start, max_nodes, stats=None):
+    """
+    Memory-bounded A* in the style of SMA*: at most max_nodes states are stored.
+    When the budget is exceeded, the worst open leaf (highest f, shallowest first)
+    is forgotten and its parent remembers the leaf's f, going back on the open
+    list with that backed-up value so the forgotten branch is regenerated only
+    if it becomes the best again. A state reached more cheaply than the stored
+    copy takes its subtree along. Any path returned is optimal. None means the
+    puzzle is unsolvable or the budget was too small: below the optimal depth
+    plus one it cannot hold a path at all, and just above that the search may
+    keep forgetting and regenerating the same f level, so it gives up after
+    STALL_FACTOR * max_nodes expansions without progress.
+    """
+    if start == GOAL: return [start]
+    if not is_solvable(start): return None
+    start = pack(start)
+    inf = float("inf")
+    # Per stored state: g, f (raised by pathmax and backed-up values), h, parent,
+    # number of children in memory and the lowest f among its forgotten children
+    g = {start: 0}
+    f = {start: manhattan(start)}
+    h = {start: f[start]}
+    parent = {start: None}
+    kids = {start: 0}
+    forgotten = {start: inf}
+    open_set = {start}
+    best = [(f[start], 0, start)]    # min-heap: lowest f, deepest first
+    worst = [(-f[start], 0, start)]  # max-heap: highest f, shallowest first
+    bound, stalled = f[start], 0  # highest f popped so far, expansions since it last rose
+
+    def push(n):
+        open_set.add(n)
+        heapq.heappush(best, (f[n], -g[n], n))
+        heapq.heappush(worst, (-f[n], g[n], n))
+
+    def backup(n):
+        # Raise the f of expanded ancestors to the best f among their children
+        # (stored or forgotten), so a fully explored branch stops looking cheap
+        while n is not None and n not in open_set:
+            lowest = forgotten[n]
+            for c in neighbors(n):
+                if parent.get(c) == n and f[c] < lowest:
+                    lowest = f[c]
+            if lowest <= f[n]: return
+            f[n] = lowest
+            n = parent[n]
+
+    def forget(n):
+        # Drop n and back its f up into its parent; a parent left with no
+        # children and nothing worth regenerating is dropped as well
+        while True:
+            p = parent[n]
+            forgotten[p] = min(forgotten[p], f[n])
+            kids[p] -= 1
+            open_set.discard(n)
+            for table in (g, f, h, parent, kids, forgotten):
+                del table[n]
+            if stats is not None: stats.add("forgotten")
+            if forgotten[p] < inf:
+                if p not in open_set or forgotten[p] < f[p]:
+                    f[p] = forgotten[p] if p not in open_set else min(f[p], forgotten[p])
+                    push(p)
+                backup(parent[p])
+                return
+            if kids[p] or p in open_set or parent[p] is None:
+                return
+            f[p] = inf
+            n = p
+
+    def shorten(n, delta):
+        # n was reached delta moves more cheaply: shift g and f of n and everything below it.
+        # f - g bounds the cost left from a state whatever the path to it, so f shifts with g
+        stack = [n]
+        while stack:
+            m = stack.pop()
+            stack.extend(c for c in neighbors(m) if parent.get(c) == m)
+            g[m] -= delta
+            f[m] -= delta
+            forgotten[m] -= delta
+            if m in open_set: push(m)
+
+    def release(p):
+        # p lost a child to a cheaper path; with no children left it has to go back on
+        # the open list (if it has forgotten children) or be dropped, never just linger
+        if kids[p] or p in open_set or parent[p] is None: return
+        if forgotten[p] < inf:
+            f[p] = forgotten[p]
+            push(p)
+        else:
+            f[p] = inf
+            forget(p)
+
+    while open_set:
+        fc, neg_g, cur = heapq.heappop(best)
+        if cur not in open_set or fc != f[cur] or -neg_g != g[cur]: continue  # stale entry
+        if fc == inf: return None  # every remaining branch needs more memory than the budget
+        if fc > bound:
+            bound, stalled = fc, 0
+        else:
+            stalled += 1
+            if stalled > STALL_FACTOR * max_nodes: return None  # thrashing: forgets and regenerates the same level
+        if cur == GOAL_CODE:
+            path = []
+            while cur is not None:
+                path.append(cur)
+                cur = parent[cur]
+            return unpack_path(path[::-1])
+        open_set.discard(cur)
+        forgotten[cur] = inf
+        ng = g[cur] + 1
+        if ng >= max_nodes:
+            # Its children could not be stored together with the path to them
+            if parent[cur] is None: return None
+            f[cur] = inf
+            forget(cur)
+            continue
+        children = neighbors_h(cur, h[cur])
+        for nb, nh in children:
+            if nb == parent[cur]: continue
+            if nb in g:
+                # Already stored: moved over (with its subtree) only if reached more cheaply
+                if ng >= g[nb]: continue
+                old_parent = parent[nb]
+                shorten(nb, g[nb] - ng)
+                kids[old_parent] -= 1
+                parent[nb] = cur
+                kids[cur] += 1
+                f[nb] = max(f[nb], fc)
+                if nb in open_set: push(nb)
+                release(old_parent)
+                continue
+            h[nb] = nh
+            kids[nb] = 0
+            forgotten[nb] = inf
+            g[nb] = ng
+            f[nb] = max(ng + nh, fc)
+            parent[nb] = cur
+            kids[cur] += 1
+            push(nb)
+        if stats is not None: stats.expand(ng - 1, len(children), len(open_set))
+        if kids[cur] == 0 and parent[cur] is not None:
+            # Dead end: every successor is stored more cheaply elsewhere
+            f[cur] = inf
+            forget(cur)
+        else:
+            backup(cur)
+
+        # Forget the worst open leaves until the stored states fit the budget again
+        while len(g) > max_nodes:
+            skipped = []
+            victim = None
+            while worst:
+                entry = heapq.heappop(worst)
+                leaf = entry[2]
+                if leaf not in open_set or -entry[0] != f[leaf] or entry[1] != g[leaf]: continue
+                if kids[leaf] or parent[leaf] is None or parent[leaf] == cur:
+                    skipped.append(entry)  # has children in memory, is the start or was just generated
+                    continue
+                victim = leaf
+                break
+            for entry in skipped:
+                heapq.heappush(worst, entry)
+            if victim is None: break
+            forget(victim)
+
+        # Lazy deletion leaves stale entries behind; rebuild the heaps before they dominate memory
+        if len(best) > 2 * len(open_set) + 64:
+            best = [(f[n], -g[n], n) for n in open_set]
+            heapq.heapify(best)
+        if len(worst) > 2 * len(open_set) + 64:
+            worst = [(-f[n], g[n], n) for n in open_set]
+            heapq.heapify(worst)
     return None
 
 if __name__ == "__main__":
+    # Usage: python exp5.py [--stats] [--max-nodes N]
+    # (--stats prints the search statistics as JSON, --max-nodes stores at most N states)
     start = (1,2,3,4,5,6,0,7,8)
-    path = astar(start)
-    if path is None:
+    stats = SearchStats("astar") if "--stats" in sys.argv else None
+    max_nodes = int(sys.argv[sys.argv.index("--max-nodes") + 1]) if "--max-nodes" in sys.argv else None
+    path = astar(start, stats, max_nodes)
+    if stats is not None:
+        stats.finish().dump()
+    if path is None and not is_solvable(start):
         print("Unsolvable.")
+    elif path is None:
+        print(f"Node budget too small: no solution found storing at most {max_nodes} states.")
     else:
         print("Optimal moves:", len(path)-1)
         for i, st in enumerate(path):
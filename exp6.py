@@ -2,13 +2,20 @@
 # Representation:
 #   node -> {
 #       "type": "OR" | "AND",
-#       "cost": h_or_base_cost,          # used for leaves; 0 for internal nodes
+#       "cost": h_or_base_cost,          # base cost of a leaf; estimate (e.g. 0) for internal nodes
 #       "edges": [ (child, edge_cost), ... ]
 #   }
 # AND is encoded by a single edge to a TUPLE of child node names: (("C","D"), edge_cost)
+#
+# For large graphs, CompactGraph.from_dict packs the same graph into flat arrays
+# with integer node ids (and saves/loads it as a binary file); CompactAOStar
+# solves that form directly.
 
+import heapq
+import os
+import struct
+from array import array
 from math import inf
-from functools import lru_cache
 
 def is_leaf(G, n):
     return len(G[n]["edges"]) == 0
@@ -17,55 +24,229 @@ def expand_and_tuple(tnode):
     # tnode is a tuple of node names, e.g., ("C", "D")
     return list(tnode)
 
+def children(G, n):
+    """All child nodes of n, each AND-tuple flattened."""
+    for (child, ec) in G[n]["edges"]:
+        if isinstance(child, tuple):
+            yield from expand_and_tuple(child)
+        else:
+            yield child
+
+def topological_rank(G):
+    """rank[n] for every node, with every parent ranked before its children (Kahn's algorithm)."""
+    kids = {n: list(children(G, n)) for n in G}
+    indegree = dict.fromkeys(G, 0)
+    for n in G:
+        for ch in kids[n]:
+            indegree[ch] += 1
+    stack = [n for n in G if indegree[n] == 0]
+    rank = {}
+    while stack:
+        n = stack.pop()
+        rank[n] = len(rank)
+        for ch in kids[n]:
+            indegree[ch] -= 1
+            if indegree[ch] == 0:
+                stack.append(ch)
+    if len(rank) != len(G):
+        raise ValueError("The AND-OR graph has a cycle.")
+    return rank
+
 class AOStar:
-    def __init__(self, graph, start):
+    """
+    Iterative AO*. A node's "cost" is its base cost if it is a leaf and a heuristic
+    estimate (never above the true cost; 0 is always safe) until it is expanded.
+    solve() walks the best partial solution graph, expands its unexpanded tips and
+    keeps walking below them; after each (doubling) batch of expansions it revises the
+    ancestors in one children-first pass that stops wherever cost and SOLVED mark stay
+    the same. If every internal estimate is 0 there is nothing for the heuristic to
+    prune, so solve() instead expands everything below the root and evaluates it
+    bottom-up in a single pass. Nothing is recursive, and the state (expanded nodes,
+    costs, SOLVED marks) is kept, so after update_edge() another solve() only redoes
+    the work the new edge cost makes necessary.
+    """
+    def __init__(self, graph, start, stats=None):
         self.G = graph
         self.start = start
-        # Best cost estimate (final exact cost after solve)
+        # Optional search_stats.SearchStats; solve() records one expansion per expanded node
+        self.stats = stats
+        # Best cost estimate (exact for SOLVED nodes)
         self.H = {n: graph[n]["cost"] for n in graph}
         # Best policy: for OR nodes -> best child; for AND nodes -> the AND-tuple
         self.best_child = {n: None for n in graph}
+        self.expanded = set()
+        self.solved = set()
+        # Expanded nodes that have an edge into each node, for the upward revision,
+        # which revises children before parents
+        self.parents = {n: set() for n in graph}
+        self.rank = topological_rank(graph)
+        # False when no internal node carries an estimate (solve() then goes bottom-up)
+        self.informed = any(graph[n]["cost"] for n in graph if not is_leaf(graph, n))
 
-    @lru_cache(maxsize=None)
-    def solve(self, node):
+    def expand(self, node):
+        self.expanded.add(node)
+        kids = list(children(self.G, node))
+        for ch in kids:
+            self.parents[ch].add(node)
+        if self.stats is not None:
+            self.stats.expand(None, len(kids))
+
+    def revise(self, node):
         """
-        Returns the minimal cost from 'node' to a terminal solution graph.
-        Populates self.H[node] and self.best_child[node].
+        Recomputes the cost, best choice and SOLVED mark of an expanded node from
+        its children's current estimates. Returns True if the cost or the SOLVED
+        mark changed, the only things its parents read.
         """
-        # Leaf: its cost is already given (heuristic/base cost)
         if is_leaf(self.G, node):
-            self.best_child[node] = None
-            self.H[node] = self.G[node]["cost"]
-            return self.H[node]
-
-        typ = self.G[node]["type"]
-        edges = self.G[node]["edges"]
-
-        if typ == "OR":
-            best_cost = inf
-            best = None
-            for (child, ec) in edges:
-                # Recurse to get the child's minimal solution cost
-                child_cost = self.solve(child)
-                total = ec + child_cost
-                if total < best_cost:
-                    best_cost = total
+            cost, best, solved = self.G[node]["cost"], None, True
+        elif self.G[node]["type"] == "OR":
+            cost, best = inf, None
+            for (child, ec) in self.G[node]["edges"]:
+                total = ec + self.H[child]
+                if total < cost:
+                    cost = total
                     best = child
-            self.best_child[node] = best
-            self.H[node] = best_cost
-            return best_cost
-
+            solved = best in self.solved
         else:  # AND node (single edge to a tuple of children)
+            edges = self.G[node]["edges"]
             assert len(edges) == 1, "Each AND node should have exactly one AND edge."
             (tnode, ec) = edges[0]
             children = expand_and_tuple(tnode)
-            total_children = 0
-            for ch in children:
-                total_children += self.solve(ch)
-            total = ec + total_children
-            self.best_child[node] = tnode
-            self.H[node] = total
-            return total
+            cost = ec + sum(self.H[ch] for ch in children)
+            best = tnode
+            solved = all(ch in self.solved for ch in children)
+
+        changed = cost != self.H[node] or solved != (node in self.solved)
+        self.H[node] = cost
+        self.best_child[node] = best
+        if solved:
+            self.solved.add(node)
+        else:
+            self.solved.discard(node)
+        return changed
+
+    def propagate(self, nodes):
+        """
+        Revises the given nodes and then, as long as something changes, their expanded
+        ancestors. Returns the revised nodes that switched to a different best choice.
+        """
+        seeds = set(nodes)
+        # Deepest first, so every node is revised once, after all its changed children
+        heap = [(-self.rank[n], n) for n in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        rechosen = []
+        while heap:
+            n = heapq.heappop(heap)[1]
+            before = self.best_child[n]
+            changed = self.revise(n)
+            if self.best_child[n] != before:
+                rechosen.append(n)
+            if not changed:
+                continue
+            for p in self.parents[n]:
+                if p not in queued:
+                    queued.add(p)
+                    heapq.heappush(heap, (-self.rank[p], p))
+        return rechosen
+
+    def find_tips(self, stack, seen):
+        """
+        Walks the best partial solution graph from the nodes on the stack and
+        returns the unexpanded nodes (tips) it reaches.
+        """
+        tips = []
+        while stack:
+            n = stack.pop()
+            if n in self.solved:
+                continue
+            if n not in self.expanded:
+                tips.append(n)
+                continue
+            bc = self.best_child[n]
+            for ch in (bc if isinstance(bc, tuple) else () if bc is None else (bc,)):
+                if ch not in seen:
+                    seen.add(ch)
+                    stack.append(ch)
+        return tips
+
+    def evaluate_below(self, root):
+        """
+        Expands every unsolved node reachable from root and revises them children
+        first (highest rank first), which leaves each of them exact and SOLVED
+        (unless its cost is inf) after a single revision.
+        """
+        order, seen = [root], {root}
+        for n in order:
+            if n in self.solved:
+                continue
+            for ch in children(self.G, n):
+                if ch not in seen:
+                    seen.add(ch)
+                    order.append(ch)
+        order.sort(key=self.rank.__getitem__, reverse=True)
+        for n in order:
+            if n in self.solved:
+                continue
+            if n not in self.expanded:
+                self.expand(n)
+            self.revise(n)
+
+    def solve(self, node=None):
+        """
+        Returns the minimal cost from 'node' (default: start) to a terminal solution graph.
+        Populates self.H and self.best_child for the nodes it needed.
+        """
+        root = self.start if node is None else node
+        if not self.informed:
+            self.evaluate_below(root)
+            return self.H[root]
+        stack, seen, fresh = [root], {root}, True
+        # New tips are revised on their own right away; their parents wait in pending
+        # for the next upward revision. The batch doubles after each one, so it never
+        # exceeds the expansions already done: expanding below tips that the revision
+        # would have abandoned at most doubles the expansions
+        pending, waiting, batch = set(), 0, 1
+        while root not in self.solved:
+            tips = self.find_tips(stack, seen)
+            if tips:
+                for tip in tips:
+                    self.expand(tip)
+                    if self.revise(tip):
+                        pending.update(self.parents[tip])
+                waiting += len(tips)
+                stack, fresh = tips, False
+                if waiting < batch:
+                    continue  # look further below the new tips first
+            elif not waiting:
+                if fresh:
+                    break  # no solution graph (every choice costs inf)
+                stack, seen, fresh = [root], {root}, True
+                continue
+            rechosen = [n for n in self.propagate(pending) if n in seen]
+            pending, waiting, batch = set(), 0, 2 * batch
+            # The walk goes on below the new tips and below every walked node that
+            # switched choices; a node that has become unreachable is only wasted
+            # work, and the walk from the root above catches anything missed
+            stack = stack + rechosen
+        if pending:
+            self.propagate(pending)
+        return self.H[root]
+
+    def update_edge(self, node, child, edge_cost):
+        """
+        Changes the cost of the edge node -> child (child is an AND-tuple for AND nodes)
+        and revises only the affected ancestors. Call solve() again afterwards.
+        """
+        edges = self.G[node]["edges"]
+        for i, (ch, ec) in enumerate(edges):
+            if ch == child:
+                edges[i] = (ch, edge_cost)
+                break
+        else:
+            raise KeyError(f"{node} has no edge to {child}")
+        if node in self.expanded:
+            self.propagate([node])
 
     def extract_solution(self):
         """
@@ -91,6 +272,327 @@ class AOStar:
         dfs(self.start)
         return sol
 
+class CompactGraph:
+    """
+    The same AND-OR graph in flat arrays, indexed by interned integer node ids.
+    Every node owns a run of connectors (CSR style): an OR node one connector per
+    edge, an AND node a single connector whose group is the AND-tuple. A connector
+    has an edge cost and a run of children in `child`:
+
+        connectors of node u:   edge_start[u] .. edge_start[u + 1] - 1
+        children of connector c: child[group_start[c] .. group_start[c + 1] - 1]
+    """
+    MAGIC = b"AOG1"
+    HEADER = struct.Struct("<4sIII")  # magic, nodes, connectors, children
+
+    def __init__(self, names, is_and, cost, edge_start, edge_cost, group_start, child):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.is_and = is_and            # bytearray, 1 for AND nodes
+        self.cost = cost                # array("d"): leaf base cost or estimate
+        self.edge_start = edge_start    # array("i"), len(names) + 1
+        self.edge_cost = edge_cost      # array("d"), one per connector
+        self.group_start = group_start  # array("i"), connectors + 1
+        self.child = child              # array("i"), child node ids
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_dict(cls, graph):
+        """
+        Interns the node names of a dict-of-dicts graph (see the top of this file) and packs it.
+        Raises ValueError for an AND node with more than one connector, which the
+        compact format (and AOStar) cannot represent.
+        """
+        names = list(graph)
+        ids = {name: i for i, name in enumerate(names)}
+        is_and = bytearray(len(names))
+        cost = array("d")
+        edge_start = array("i", [0])
+        edge_cost = array("d")
+        group_start = array("i", [0])
+        child = array("i")
+        for i, name in enumerate(names):
+            node = graph[name]
+            is_and[i] = node["type"] == "AND"
+            if is_and[i] and len(node["edges"]) > 1:
+                raise ValueError(f"AND node {name!r} has {len(node['edges'])} connectors; "
+                                 "give it a single edge to a tuple of all its children")
+            cost.append(node["cost"])
+            for (ch, ec) in node["edges"]:
+                child.extend(ids[c] for c in (expand_and_tuple(ch) if isinstance(ch, tuple) else (ch,)))
+                group_start.append(len(child))
+                edge_cost.append(ec)
+            edge_start.append(len(edge_cost))
+        return cls(names, is_and, cost, edge_start, edge_cost, group_start, child)
+
+    def save(self, path):
+        """Writes the arrays (native byte order) and the UTF-8 node names to a binary file."""
+        encoded = [name.encode() for name in self.names]
+        with open(path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, len(self.names), len(self.edge_cost), len(self.child)))
+            f.write(self.is_and)
+            for arr in (self.cost, self.edge_start, self.edge_cost, self.group_start, self.child,
+                        array("I", map(len, encoded))):
+                arr.tofile(f)
+            f.write(b"".join(encoded))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            magic, n, m, k = cls.HEADER.unpack(f.read(cls.HEADER.size))
+            if magic != cls.MAGIC:
+                raise ValueError(f"{path} is not a saved AND-OR graph")
+            is_and = bytearray(f.read(n))
+            arrays = []
+            for typecode, count in (("d", n), ("i", n + 1), ("d", m), ("i", m + 1), ("i", k), ("I", n)):
+                arr = array(typecode)
+                arr.fromfile(f, count)
+                arrays.append(arr)
+            blob = f.read()
+        lengths = arrays.pop()
+        names = []
+        pos = 0
+        for length in lengths:
+            names.append(blob[pos:pos + length].decode())
+            pos += length
+        return cls(names, is_and, *arrays)
+
+class CompactAOStar:
+    """
+    AOStar on a CompactGraph: the same batched expansion, upward revision and
+    bottom-up fast path, with per-node state in flat arrays and node ids instead
+    of names. best[u] is the chosen connector of an expanded node (-1 for leaves
+    and unexpanded nodes).
+    """
+    def __init__(self, graph, start, stats=None):
+        self.G = graph
+        self.start = graph.ids[start] if isinstance(start, str) else start
+        self.stats = stats
+        n = len(graph)
+        self.H = array("d", graph.cost)
+        self.best = array("i", [-1]) * n
+        self.expanded = bytearray(n)
+        self.solved = bytearray(n)
+        # Reverse CSR: the nodes with a connector into each node
+        counts = array("i", [0]) * (n + 1)
+        for c in graph.child:
+            counts[c + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        self.parent_start = array("i", counts)
+        self.parent = array("i", [0]) * len(graph.child)
+        fill = array("i", counts[:n])
+        for u in range(n):
+            for c in range(graph.edge_start[u], graph.edge_start[u + 1]):
+                for k in range(graph.group_start[c], graph.group_start[c + 1]):
+                    v = graph.child[k]
+                    self.parent[fill[v]] = u
+                    fill[v] += 1
+        # Topological rank (parents before children), as in AOStar
+        indegree = array("i", (self.parent_start[v + 1] - self.parent_start[v] for v in range(n)))
+        stack = [v for v in range(n) if indegree[v] == 0]
+        self.rank = array("i", [0]) * n
+        ranked = 0
+        while stack:
+            u = stack.pop()
+            self.rank[u] = ranked
+            ranked += 1
+            for k in range(graph.group_start[graph.edge_start[u]], graph.group_start[graph.edge_start[u + 1]]):
+                v = graph.child[k]
+                indegree[v] -= 1
+                if indegree[v] == 0:
+                    stack.append(v)
+        if ranked != n:
+            raise ValueError("The AND-OR graph has a cycle.")
+        # order[r] is the node of rank r, so the revision heap can hold bare ranks
+        self.order = array("i", [0]) * n
+        for u in range(n):
+            self.order[self.rank[u]] = u
+        # Marks the nodes already on the revision heap; cleared after each propagate()
+        self.queued = bytearray(n)
+        self.informed = any(graph.cost[u] for u in range(n) if graph.edge_start[u] != graph.edge_start[u + 1])
+
+    def expand(self, u):
+        self.expanded[u] = 1
+        if self.stats is not None:
+            G = self.G
+            self.stats.expand(None, G.group_start[G.edge_start[u + 1]] - G.group_start[G.edge_start[u]])
+
+    def revise(self, u):
+        """Recomputes H, best connector and SOLVED mark of expanded node u; True if H or SOLVED changed."""
+        G, H, child = self.G, self.H, self.G.child
+        group_start, edge_cost = G.group_start, G.edge_cost
+        first, last = G.edge_start[u], G.edge_start[u + 1]
+        if first == last:
+            cost, best, solved = G.cost[u], -1, 1
+        else:
+            cost, best = inf, -1
+            for c in range(first, last):
+                total = edge_cost[c]
+                for k in range(group_start[c], group_start[c + 1]):
+                    total += H[child[k]]
+                if total < cost:
+                    cost, best = total, c
+            solved = 0
+            if best >= 0:
+                is_solved = self.solved
+                solved = 1
+                for k in range(group_start[best], group_start[best + 1]):
+                    if not is_solved[child[k]]:
+                        solved = 0
+                        break
+        changed = cost != H[u] or solved != self.solved[u]
+        H[u] = cost
+        self.best[u] = best
+        self.solved[u] = solved
+        return changed
+
+    def propagate(self, nodes):
+        """Revises nodes and their affected ancestors; returns the revised nodes that switched connectors."""
+        rank, order, queued = self.rank, self.order, self.queued
+        parent_start, parent, expanded, best = self.parent_start, self.parent, self.expanded, self.best
+        touched = []
+        for u in nodes:
+            if not queued[u]:
+                queued[u] = 1
+                touched.append(u)
+        # Deepest (highest rank) first; the heap holds negated ranks
+        heap = [-rank[u] for u in touched]
+        heapq.heapify(heap)
+        rechosen = []
+        while heap:
+            u = order[-heapq.heappop(heap)]
+            before = best[u]
+            changed = self.revise(u)
+            if best[u] != before:
+                rechosen.append(u)
+            if not changed:
+                continue
+            for i in range(parent_start[u], parent_start[u + 1]):
+                p = parent[i]
+                if expanded[p] and not queued[p]:
+                    queued[p] = 1
+                    touched.append(p)
+                    heapq.heappush(heap, -rank[p])
+        for u in touched:
+            queued[u] = 0
+        return rechosen
+
+    def best_children(self, u):
+        c = self.best[u]
+        if c < 0:
+            return ()
+        return self.G.child[self.G.group_start[c]:self.G.group_start[c + 1]]
+
+    def find_tips(self, stack, seen):
+        G, best = self.G, self.best
+        group_start, child = G.group_start, G.child
+        tips = []
+        while stack:
+            u = stack.pop()
+            if self.solved[u]:
+                continue
+            if not self.expanded[u]:
+                tips.append(u)
+                continue
+            c = best[u]
+            if c < 0:
+                continue
+            for k in range(group_start[c], group_start[c + 1]):
+                v = child[k]
+                if v not in seen:
+                    seen.add(v)
+                    stack.append(v)
+        return tips
+
+    def evaluate_below(self, root):
+        """AOStar.evaluate_below on node ids."""
+        G = self.G
+        edge_start, group_start, child = G.edge_start, G.group_start, G.child
+        seen = bytearray(len(G))
+        seen[root] = 1
+        order = [root]
+        for u in order:
+            if self.solved[u]:
+                continue
+            for k in range(group_start[edge_start[u]], group_start[edge_start[u + 1]]):
+                v = child[k]
+                if not seen[v]:
+                    seen[v] = 1
+                    order.append(v)
+        order.sort(key=self.rank.__getitem__, reverse=True)
+        for u in order:
+            if self.solved[u]:
+                continue
+            if not self.expanded[u]:
+                self.expand(u)
+            self.revise(u)
+
+    def solve(self, node=None):
+        """Minimal cost from node (name or id; default: start) to a terminal solution graph."""
+        root = self.start if node is None else self.G.ids[node] if isinstance(node, str) else node
+        if not self.informed:
+            self.evaluate_below(root)
+            return self.H[root]
+        parent_start, parent, expanded = self.parent_start, self.parent, self.expanded
+        stack, seen, fresh = [root], {root}, True
+        # Batched as in AOStar.solve
+        pending, waiting, batch = [], 0, 1
+        while not self.solved[root]:
+            tips = self.find_tips(stack, seen)
+            if tips:
+                for tip in tips:
+                    self.expand(tip)
+                    if self.revise(tip):
+                        for i in range(parent_start[tip], parent_start[tip + 1]):
+                            if expanded[parent[i]]:
+                                pending.append(parent[i])
+                waiting += len(tips)
+                stack, fresh = tips, False
+                if waiting < batch:
+                    continue
+            elif not waiting:
+                if fresh:
+                    break
+                stack, seen, fresh = [root], {root}, True
+                continue
+            rechosen = [u for u in self.propagate(pending) if u in seen]
+            pending, waiting, batch = [], 0, 2 * batch
+            stack = stack + rechosen
+        if pending:
+            self.propagate(pending)
+        return self.H[root]
+
+    def update_edge(self, node, child, edge_cost):
+        """Like AOStar.update_edge, with node and child given by name (child: AND-tuple for AND nodes)."""
+        G = self.G
+        u = G.ids[node]
+        group = [G.ids[c] for c in (child if isinstance(child, tuple) else (child,))]
+        for c in range(G.edge_start[u], G.edge_start[u + 1]):
+            if list(G.child[G.group_start[c]:G.group_start[c + 1]]) == group:
+                G.edge_cost[c] = edge_cost
+                break
+        else:
+            raise KeyError(f"{node} has no edge to {child}")
+        if self.expanded[u]:
+            self.propagate([u])
+
+    def extract_solution(self):
+        """Names of the solution graph nodes, in the same order as AOStar.extract_solution."""
+        sol = []
+        seen = set()
+        stack = [self.start]
+        while stack:
+            u = stack.pop()
+            if u in seen:
+                continue
+            seen.add(u)
+            sol.append(self.G.names[u])
+            stack.extend(reversed(self.best_children(u)))
+        return sol
+
 if __name__ == "__main__":
     # Example graph (acyclic):
     # S (OR) -> A (edge 1), B (edge 2)
@@ -113,3 +615,15 @@ if __name__ == "__main__":
     print("Best costs (H):", ao.H)
     print("Policy (best_child):", ao.best_child)
     print("Solution graph walk:", " -> ".join(ao.extract_solution()))
+
+    # Make B -> E expensive: only B and S are revised, and S switches to A
+    ao.update_edge("B", "E", 5)
+    print("After B -> E costs 5:", ao.solve(), "via", " -> ".join(ao.extract_solution()))
+
+    # The same graph in flat arrays, saved to and loaded back from a binary file
+    compact = CompactGraph.from_dict(G)
+    compact.save("exp6-graph.bin")
+    compact = CompactGraph.load("exp6-graph.bin")
+    os.remove("exp6-graph.bin")
+    cao = CompactAOStar(compact, "S")
+    print("Compact graph:", cao.solve(), "via", " -> ".join(cao.extract_solution()))
@@ -0,0 +1,293 @@
+# N x N sliding-tile puzzle IDA* with additive pattern databases
+# Default partitions cover the 8-puzzle (3x3) and 15-puzzle (4x4); larger
+# boards work with an explicit partition (table size grows as (N*N)!/(N*N-k)!
+# for a k-tile group). Goal and solvability follow the 8-puzzle conventions:
+# tiles 1..N*N-1 in order, blank (0) last.
+#
+# A pattern database (PDB) stores, for every placement of a group of tiles, the
+# minimum number of moves of *those* tiles needed to reach their goal cells.
+# With disjoint groups (e.g. 6-6-3 for the 15-puzzle) the lookups can be added
+# and still never overestimate. Each PDB is generated once by a retrograde
+# breadth-first search from the goal, stored as a byte array on disk and
+# memory-mapped when loaded.
+
+import mmap
+import os
+import random
+import sys
+import time
+from array import array
+from math import isqrt, perm
+
+PDB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdb")
+UNSEEN = 255
+
+DEFAULT_PARTITIONS = {
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4)),
+}
+
+def goal_state(n):
+    """(1, 2, ..., n*n - 1, 0), the N x N version of the 8-puzzle GOAL."""
+    return tuple(range(1, n * n)) + (0,)
+
+def is_solvable_n(state, n):
+    """
+    The 8-puzzle inversion-parity rule generalized to N x N: for odd N the
+    number of inversions must be even; for even N the inversions plus the
+    blank's row counted from the bottom (1-based) must be odd.
+    """
+    arr = [x for x in state if x != 0]
+    inv = sum(arr[i] > arr[j] for i in range(len(arr)) for j in range(i + 1, len(arr)))
+    if n % 2 == 1:
+        return inv % 2 == 0
+    row_from_bottom = n - state.index(0) // n
+    return (inv + row_from_bottom) % 2 == 1
+
+def blank_moves(n):
+    """blank_moves(n)[cell] lists the cells the blank can move to from cell."""
+    moves = []
+    for cell in range(n * n):
+        r, c = divmod(cell, n)
+        moves.append(tuple(nr * n + nc for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+                           if 0 <= nr < n and 0 <= nc < n))
+    return moves
+
+def rank_positions(positions, cells):
+    """Dense index of an ordered placement of k tiles on `cells` cells (0 .. cells!/(cells-k)! - 1)."""
+    index = 0
+    used = 0
+    for i, p in enumerate(positions):
+        index = index * (cells - i) + p - (used & ((1 << p) - 1)).bit_count()
+        used |= 1 << p
+    return index
+
+class PatternDatabase:
+    """
+    Additive PDB for one group of tiles on an N x N board.
+    table[rank_positions(cells of the tiles)] = moves of these tiles to reach their goal cells.
+    """
+    def __init__(self, n, tiles, table):
+        self.n = n
+        self.tiles = tuple(tiles)
+        self.table = table
+
+    @staticmethod
+    def size(n, tiles):
+        return perm(n * n, len(tiles))
+
+    @staticmethod
+    def filename(n, tiles, directory=PDB_DIR):
+        return os.path.join(directory, f"pdb{n}x{n}-{'-'.join(map(str, tiles))}.bin")
+
+    @classmethod
+    def build(cls, n, tiles, verbose=False):
+        """
+        Retrograde BFS from the goal over (tile cells, blank cell) states.
+        Moving a pattern tile costs 1, moving any other tile costs 0, so layers
+        are expanded 0-1 BFS style; the first layer that reaches a placement
+        (over all blank cells) gives its table entry.
+        """
+        start_time = time.time()
+        cells = n * n
+        k = len(tiles)
+        moves = blank_moves(n)
+        goal = goal_state(n)
+        table = bytearray([UNSEEN]) * cls.size(n, tiles)
+        # dist is indexed by rank * cells + blank; states pack each cell in
+        # `width` bits with the blank on top, in 64-bit arrays when they fit
+        dist = bytearray([UNSEEN]) * (len(table) * cells)
+        width = (cells - 1).bit_length()
+        mask = (1 << width) - 1
+        new_layer = (lambda: array("Q")) if width * (k + 1) <= 64 else list
+        start_positions = [goal.index(t) for t in tiles]
+        start = sum(p << (width * i) for i, p in enumerate(start_positions)) | ((cells - 1) << (width * k))
+        dist[rank_positions(start_positions, cells) * cells + cells - 1] = 0
+        layer = new_layer()
+        layer.append(start)
+        d = 0
+        while layer:
+            next_layer = new_layer()
+            stack = layer
+            while stack:
+                state = stack.pop()
+                positions = [(state >> (width * i)) & mask for i in range(k)]
+                blank = state >> (width * k)
+                r = rank_positions(positions, cells)
+                if dist[r * cells + blank] != d:
+                    continue  # reached again later at a lower cost
+                if table[r] == UNSEEN:
+                    table[r] = d
+                for target in moves[blank]:
+                    if target in positions:
+                        # A pattern tile slides into the blank: cost 1
+                        j = positions.index(target)
+                        positions[j] = blank
+                        child_rank = rank_positions(positions, cells)
+                        positions[j] = target
+                        idx = child_rank * cells + target
+                        if dist[idx] == UNSEEN:
+                            dist[idx] = d + 1
+                            next_layer.append(state + ((blank - target) << (width * j)) + ((target - blank) << (width * k)))
+                    else:
+                        # Any other tile: free in this abstraction, stays in layer d
+                        idx = r * cells + target
+                        if dist[idx] > d:
+                            dist[idx] = d
+                            stack.append(state + ((target - blank) << (width * k)))
+            d += 1
+            if verbose:
+                print(f"  layer {d - 1} done, next layer {len(next_layer)} states ({time.time() - start_time:.1f}s)")
+            layer = next_layer
+        return cls(n, tiles, table)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(self.table)
+
+    @classmethod
+    def load(cls, n, tiles, path):
+        """Memory-maps a saved table; returns None if the file is missing or has the wrong size."""
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            if os.fstat(f.fileno()).st_size != cls.size(n, tiles):
+                return None
+            table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(n, tiles, table)
+
+def load_pdbs(n, partition=None, directory=PDB_DIR, verbose=True):
+    """Loads (or builds and saves, the first time) the additive PDBs for an N x N board."""
+    if partition is None:
+        if n not in DEFAULT_PARTITIONS:
+            raise ValueError(f"No default pattern partition for {n}x{n}; pass one explicitly.")
+        partition = DEFAULT_PARTITIONS[n]
+    covered = sorted(t for tiles in partition for t in tiles)
+    if covered != list(range(1, n * n)):
+        raise ValueError("The pattern partition must cover every tile exactly once.")
+    pdbs = []
+    for tiles in partition:
+        path = PatternDatabase.filename(n, tiles, directory)
+        pdb = PatternDatabase.load(n, tiles, path)
+        if pdb is None:
+            if verbose:
+                print(f"Building pattern database {path} ...")
+            start_time = time.time()
+            PatternDatabase.build(n, tiles).save(path)
+            if verbose:
+                print(f"  done in {time.time() - start_time:.1f} seconds.")
+            pdb = PatternDatabase.load(n, tiles, path)
+        pdbs.append(pdb)
+    return pdbs
+
+def idastar(start, pdbs=None, n=None, stats=None):
+    """
+    Optimal solution path (list of state tuples, start to goal) or None if unsolvable.
+    start is a flat N*N tuple with 0 as the blank.
+    stats, if given, is a search_stats.SearchStats; each f bound is timed as its own phase.
+    """
+    n = n or isqrt(len(start))
+    cells = n * n
+    goal = goal_state(n)
+    if tuple(start) == goal: return [tuple(start)]
+    if not is_solvable_n(start, n): return None
+    if pdbs is None:
+        pdbs = load_pdbs(n)
+
+    moves = blank_moves(n)
+    board = list(start)
+    position = [0] * cells
+    for cell, tile in enumerate(board):
+        position[tile] = cell
+    group_of = [None] * cells
+    for g, pdb in enumerate(pdbs):
+        for tile in pdb.tiles:
+            group_of[tile] = g
+    tables = [pdb.table for pdb in pdbs]
+    group_tiles = [pdb.tiles for pdb in pdbs]
+    group_h = [tables[g][rank_positions([position[t] for t in group_tiles[g]], cells)] for g in range(len(pdbs))]
+    blank_path = [board.index(0)]
+    FOUND = -1
+
+    def search(g, bound, h, prev_blank):
+        # Depth-first search below the f bound with in-place make/unmake moves
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0:
+            return FOUND
+        blank = blank_path[-1]
+        if stats is not None:
+            stats.expand(g, len(moves[blank]), len(blank_path))
+        next_bound = float("inf")
+        for target in moves[blank]:
+            if target == prev_blank:
+                continue  # never undo the previous move
+            tile = board[target]
+            grp = group_of[tile]
+            board[blank], board[target] = tile, 0
+            position[tile] = blank
+            old = group_h[grp]
+            group_h[grp] = tables[grp][rank_positions([position[t] for t in group_tiles[grp]], cells)]
+            blank_path.append(target)
+            t = search(g + 1, bound, h - old + group_h[grp], blank)
+            if t == FOUND:
+                return FOUND
+            blank_path.pop()
+            group_h[grp] = old
+            position[tile] = target
+            board[blank], board[target] = 0, tile
+            if t < next_bound:
+                next_bound = t
+        return next_bound
+
+    bound = sum(group_h)
+    while True:
+        if stats is not None:
+            stats.phase(f"bound {bound}")
+        t = search(0, bound, sum(group_h), None)
+        if t == FOUND:
+            break
+        if t == float("inf"):
+            return None
+        bound = t
+
+    # Replay the blank moves from the start to rebuild the states
+    state = list(start)
+    path = [tuple(state)]
+    for blank, target in zip(blank_path, blank_path[1:]):
+        state[blank], state[target] = state[target], 0
+        path.append(tuple(state))
+    return path
+
+if __name__ == "__main__":
+    # Usage: python idastar.py [n]   (n=3: the 8-puzzle example, n>=4: a scrambled board)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    if n == 3:
+        start = (1,2,3,4,5,6,0,7,8)
+    else:
+        # Random walk from the goal so the instance is solvable
+        rng = random.Random(0)
+        state = list(goal_state(n))
+        moves = blank_moves(n)
+        blank = n * n - 1
+        for _ in range(100):
+            target = rng.choice(moves[blank])
+            state[blank], state[target] = state[target], 0
+            blank = target
+        start = tuple(state)
+
+    pdbs = load_pdbs(n)
+    start_time = time.time()
+    path = idastar(start, pdbs, n)
+    if path is None:
+        print("Unsolvable.")
+    else:
+        print(f"Optimal moves: {len(path) - 1} (solved in {time.time() - start_time:.2f} seconds)")
+        for i, st in enumerate(path):
+            print(f"Step {i}:")
+            for r in range(0, n * n, n):
+                print(st[r:r + n])
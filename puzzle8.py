@@ -0,0 +1,116 @@
+# Shared 8-puzzle state encoding for the BFS, DFID, A* and best-first solvers.
+# A board is packed into a single int: tile at position i in bits 4*i..4*i+3
+# (36 bits for the board) plus the blank's position in bits 36..39.
+# Successors are produced by bit arithmetic from precomputed blank-move tables,
+# so search nodes, visited sets and parent maps hold small ints instead of tuples.
+# The Manhattan heuristic is updated per move from a tile x position table,
+# since only one tile moves and its distance changes by exactly +-1.
+# rank/unrank map boards to 0 .. 9! - 1 for flat per-state tables.
+
+GOAL = (1, 2, 3, 4, 5, 6, 7, 8, 0)
+BLANK_SHIFT = 36
+BOARD_MASK = (1 << BLANK_SHIFT) - 1
+
+def pack(state):
+    """Packs a 9-tuple (0 = blank) into an int."""
+    code = 0
+    for i, v in enumerate(state):
+        code |= v << (4 * i)
+    return code | (state.index(0) << BLANK_SHIFT)
+
+def unpack(code):
+    """Inverse of pack: returns the board as a 9-tuple."""
+    return tuple((code >> (4 * i)) & 15 for i in range(9))
+
+def blank_index(code):
+    return code >> BLANK_SHIFT
+
+def tile_at(code, i):
+    return (code >> (4 * i)) & 15
+
+GOAL_CODE = pack(GOAL)
+
+def _build_move_tables():
+    # For each blank position b and each legal target nb (order: up, down, left, right):
+    # child = code + tile * multiplier + blank_delta, where tile = (code >> shift) & 15
+    moves = []
+    for b in range(9):
+        r, c = divmod(b, 3)
+        entries = []
+        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < 3 and 0 <= nc < 3:
+                nb = nr * 3 + nc
+                entries.append((4 * nb, (1 << (4 * b)) - (1 << (4 * nb)), (nb - b) << BLANK_SHIFT))
+        moves.append(tuple(entries))
+    return tuple(moves)
+
+MOVE_TABLE = _build_move_tables()
+
+def neighbors(code):
+    """All successors of a packed board, in up/down/left/right order of the blank."""
+    return [code + ((code >> shift) & 15) * mult + delta
+            for shift, mult, delta in MOVE_TABLE[code >> BLANK_SHIFT]]
+
+# MANHATTAN[tile][pos]: distance of tile at pos from its goal position (0 for the blank)
+MANHATTAN = tuple(
+    tuple(0 if tile == 0 else
+          abs(pos // 3 - GOAL.index(tile) // 3) + abs(pos % 3 - GOAL.index(tile) % 3)
+          for pos in range(9))
+    for tile in range(9)
+)
+
+def manhattan(code):
+    """Full Manhattan distance of a packed board; use neighbors_h to update it per move."""
+    return sum(MANHATTAN[(code >> (4 * i)) & 15][i] for i in range(9))
+
+def _build_h_move_tables():
+    # Same moves as MOVE_TABLE plus, per tile, the heuristic change when that tile
+    # slides from the target position nb into the blank position b
+    tables = []
+    for b, entries in enumerate(MOVE_TABLE):
+        h_entries = []
+        for shift, mult, delta in entries:
+            nb = shift // 4
+            h_delta = tuple(MANHATTAN[tile][b] - MANHATTAN[tile][nb] if tile < 9 else 0 for tile in range(16))
+            h_entries.append((shift, mult, delta, h_delta))
+        tables.append(tuple(h_entries))
+    return tuple(tables)
+
+MOVE_H_TABLE = _build_h_move_tables()
+
+def neighbors_h(code, h):
+    """Successors of a packed board with heuristic h, as (child, child_h) pairs in O(1) each."""
+    result = []
+    for shift, mult, delta, h_delta in MOVE_H_TABLE[code >> BLANK_SHIFT]:
+        tile = (code >> shift) & 15
+        result.append((code + tile * mult + delta, h + h_delta[tile]))
+    return result
+
+def rank(code):
+    """Permutation rank (0 .. 9! - 1) of a packed board, for indexing flat per-state tables."""
+    index = 0
+    used = 0
+    for i in range(9):
+        tile = (code >> (4 * i)) & 15
+        index = index * (9 - i) + tile - (used & ((1 << tile) - 1)).bit_count()
+        used |= 1 << tile
+    return index
+
+def unrank(index):
+    """Inverse of rank: returns the packed board."""
+    digits = []
+    for base in range(1, 10):
+        index, d = divmod(index, base)
+        digits.append(d)
+    remaining = list(range(9))
+    state = [remaining.pop(d) for d in reversed(digits)]
+    return pack(state)
+
+def is_solvable(state):
+    arr = [x for x in state if x != 0]
+    inv = sum(arr[i] > arr[j] for i in range(len(arr)) for j in range(i + 1, len(arr)))
+    return inv % 2 == 0
+
+def unpack_path(codes):
+    return [unpack(code) for code in codes]
@@ -0,0 +1,150 @@
+# Batch 8-puzzle solving: reads boards one per line from files or stdin, solves
+# them across a process pool and streams one JSON line per board back, in input
+# order. Each line is either 9 tiles (0 = blank, separated by spaces or commas),
+# optionally preceded by an algorithm name ("astar 1 2 3 4 5 6 0 7 8"), or a JSON
+# object {"board": [...], "algorithm": "..."}. Blank lines and "#" comments are skipped.
+
+import argparse
+import contextlib
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+
+from exp1 import bfs, bidirectional_bfs
+from exp2 import iddfs
+from exp5 import astar
+from puzzle8_table import load_table, solve as table_solve
+from search_stats import SearchStats
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Bundle", "Exp-1-8-Puzzle"))
+from best_first_search_8_puzzle import solve_puzzle
+
+def best_first(start, stats=None):
+    """solve_puzzle on a flat 9-tuple, with its row-tuple path flattened back."""
+    path = solve_puzzle([start[r:r + 3] for r in range(0, 9, 3)], stats)
+    return None if path is None else [sum(board, ()) for board in path]
+
+def table(start, stats=None):
+    """
+    Distance-table lookup (see puzzle8_table); no nodes are expanded unless the
+    table file is missing and it falls back to A*.
+    """
+    return table_solve(start, _table, stats)
+
+ALGORITHMS = {
+    "bfs": bfs,
+    "bidirectional": bidirectional_bfs,
+    "iddfs": iddfs,
+    "astar": astar,
+    "best-first": best_first,
+    "table": table,
+}
+
+# Per-worker state, set up once by init_worker
+_default_algorithm = "astar"
+_include_path = True
+_table = None
+_cache = {}
+
+def init_worker(default_algorithm, include_path):
+    global _default_algorithm, _include_path, _table
+    _default_algorithm = default_algorithm
+    _include_path = include_path
+    _table = load_table()
+
+def parse_line(line):
+    """Returns (algorithm, board tuple) for one input line; raises ValueError if malformed."""
+    line = line.strip()
+    if line.startswith("{"):
+        request = json.loads(line)
+        board = request["board"]
+        algorithm = request.get("algorithm", _default_algorithm)
+    else:
+        parts = line.replace(",", " ").split()
+        algorithm = _default_algorithm
+        if parts and not parts[0].isdigit():
+            algorithm = parts.pop(0)
+        board = [int(x) for x in parts]
+    board = tuple(board)
+    if sorted(board) != list(range(9)):
+        raise ValueError("a board must contain the tiles 0..8 exactly once")
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"unknown algorithm '{algorithm}' (choose from {', '.join(ALGORITHMS)})")
+    return algorithm, board
+
+def solve_line(job):
+    """Worker: solves one numbered input line and returns its JSON result line."""
+    index, line = job
+    result = {"index": index}
+    try:
+        algorithm, board = parse_line(line)
+    except (ValueError, KeyError, TypeError) as e:
+        result["error"] = str(e)
+        return json.dumps(result)
+    result.update(algorithm=algorithm, board=board)
+
+    # Repeated boards are answered from this worker's cache of earlier results; the
+    # row reports the lookup, not the search that originally produced the answer
+    start_time = time.perf_counter()
+    key = (algorithm, board)
+    if key in _cache:
+        result.update(_cache[key], expanded=0, generated=0, peak_frontier=0, cached=True)
+        result["seconds"] = round(time.perf_counter() - start_time, 6)
+        return json.dumps(result)
+
+    # The solvers print diagnostics (e.g. "not solvable"); keep stdout for the JSON stream
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        stats = SearchStats(algorithm)
+        path = ALGORITHMS[algorithm](board, stats=stats)
+        stats.finish()
+    solved = {
+        "solvable": path is not None,
+        "moves": None if path is None else len(path) - 1,
+        "path": path if _include_path else None,
+        "expanded": stats.expanded,
+        "generated": stats.generated,
+        "peak_frontier": stats.peak_frontier,
+        "seconds": round(stats.seconds, 6),
+    }
+    _cache[key] = solved
+    result.update(solved)
+    return json.dumps(result)
+
+def read_lines(filenames):
+    """Yields (index, line) for every board line of the given files ("-" = stdin)."""
+    index = 0
+    for filename in filenames or ["-"]:
+        f = sys.stdin if filename == "-" else open(filename)
+        try:
+            for line in f:
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                yield index, line
+                index += 1
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+def solve_batch(lines, algorithm="astar", workers=None, include_path=True, chunksize=8):
+    """Yields the JSON result lines for (index, line) jobs in input order."""
+    workers = workers or os.cpu_count() or 1
+    with mp.Pool(workers, initializer=init_worker, initargs=(algorithm, include_path)) as pool:
+        yield from pool.imap(solve_line, lines, chunksize)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve many 8-puzzle boards in parallel, one JSON line per board.")
+    parser.add_argument("files", nargs="*", help="input files with one board per line (default: stdin)")
+    parser.add_argument("-a", "--algorithm", default="astar", choices=list(ALGORITHMS),
+                        help="algorithm for lines that do not name one (default: astar)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--no-path", action="store_true", help="omit the solution paths from the output")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    count = 0
+    for out in solve_batch(read_lines(args.files), args.algorithm, args.workers, not args.no_path):
+        print(out, flush=True)
+        count += 1
+    print(f"Solved {count} boards in {time.time() - start_time:.2f} seconds.", file=sys.stderr)
@@ -0,0 +1,107 @@
+# Precomputed optimal-distance table for the whole 8-puzzle state space.
+# A backward BFS from GOAL visits all 181,440 solvable boards once; every board's
+# distance to GOAL and the blank move that leads one step closer are stored in a
+# byte array indexed by puzzle8.rank. Once the table exists, an optimal path is
+# read off by following the stored moves, with no search at all.
+#
+# Entry layout: distance in the low 5 bits (at most 31), index of the best move in
+# MOVE_TABLE[blank] order in the two bits above. Unsolvable boards keep UNREACHABLE.
+
+import mmap
+import os
+import sys
+import time
+from collections import deque
+from math import factorial
+
+from puzzle8 import BLANK_SHIFT, GOAL, GOAL_CODE, MOVE_TABLE, is_solvable, pack, rank, unpack_path
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdb", "puzzle8-distances.bin")
+TABLE_SIZE = factorial(9)
+DIST_MASK = 31
+MOVE_SHIFT = 5
+UNREACHABLE = 255
+
+def build_table():
+    """Backward BFS from GOAL over packed boards; returns the filled bytearray."""
+    table = bytearray([UNREACHABLE]) * TABLE_SIZE
+    table[rank(GOAL_CODE)] = 0
+    q = deque([GOAL_CODE])
+    while q:
+        cur = q.popleft()
+        d = table[rank(cur)] & DIST_MASK
+        blank = cur >> BLANK_SHIFT
+        for shift, mult, delta in MOVE_TABLE[blank]:
+            nb = cur + ((cur >> shift) & 15) * mult + delta
+            r = rank(nb)
+            if table[r] != UNREACHABLE:
+                continue
+            # From nb, the blank has to move back to cur's blank position
+            nb_blank = nb >> BLANK_SHIFT
+            move = next(j for j, entry in enumerate(MOVE_TABLE[nb_blank]) if entry[0] == 4 * blank)
+            table[r] = (d + 1) | (move << MOVE_SHIFT)
+            q.append(nb)
+    return table
+
+def save_table(table, path=TABLE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(table)
+
+def load_table(path=TABLE_PATH):
+    """Memory-maps a saved table; returns None if the file is missing or has the wrong size."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        if os.fstat(f.fileno()).st_size != TABLE_SIZE:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def distance(start, table):
+    """Optimal number of moves from start to GOAL, or None if unsolvable."""
+    entry = table[rank(pack(start))]
+    return None if entry == UNREACHABLE else entry & DIST_MASK
+
+def solve(start, table=None, stats=None):
+    """
+    Optimal path (list of 9-tuples, start to GOAL) by following the stored best
+    moves, or None if unsolvable. Falls back to A* when no table is available;
+    stats, if given, is passed to that A* search (a lookup expands no nodes).
+    """
+    if table is None:
+        table = load_table()
+    if table is None:
+        from exp5 import astar
+        return astar(start, stats)
+    if start == GOAL: return [start]
+    if not is_solvable(start): return None
+    cur = pack(start)
+    path = [cur]
+    while cur != GOAL_CODE:
+        entry = table[rank(cur)]
+        shift, mult, delta = MOVE_TABLE[cur >> BLANK_SHIFT][entry >> MOVE_SHIFT]
+        cur = cur + ((cur >> shift) & 15) * mult + delta
+        path.append(cur)
+    return unpack_path(path)
+
+if __name__ == "__main__":
+    # Usage: python puzzle8_table.py [--build]   (--build regenerates the table file)
+    if "--build" in sys.argv or load_table() is None:
+        start_time = time.time()
+        save_table(build_table())
+        print(f"Built {TABLE_PATH} in {time.time() - start_time:.2f} seconds.")
+
+    start = (1,2,3,4,5,6,0,7,8)
+    table = load_table()
+    start_time = time.time()
+    path = solve(start, table)
+    if path is None:
+        print("Unsolvable.")
+    else:
+        print(f"Optimal moves: {len(path) - 1} (looked up in {1e6 * (time.time() - start_time):.0f} microseconds)")
+        for i, st in enumerate(path):
+            print(f"Step {i}:")
+            for r in range(0,9,3):
+                print(st[r:r+3])
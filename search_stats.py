@@ -0,0 +1,114 @@
+# Shared instrumentation for the search solvers (BFS, DFID, A*, best-first, AO*)
+# and the SAT solvers (local search flips, CDCL conflicts).
+# Every solver takes an optional `stats` argument; with the default None the only
+# cost is one `is not None` check per expansion. The solvers only call expand,
+# add and phase, so any object with those methods can be passed in (the Bundle
+# scripts rely on that and do not import this module). The caller creates the
+# object right before the run and calls finish() right after it.
+#
+#   stats.expand(depth, generated, frontier)   once per expanded node (solver)
+#   stats.add(counter, amount)                 bump a named counter, e.g. "flips" (solver)
+#   stats.phase(name)                          start timing a named phase (solver)
+#   stats.finish()                             stop the clock, record peak memory (caller)
+
+import json
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+class SearchStats:
+    """
+    Counters for one solver run: expanded and generated nodes, expansions per
+    depth, peak frontier size, wall-clock time per phase and peak memory.
+    With track_memory=True the peak is measured by tracemalloc (exact Python
+    allocations during the run, but slows the search down noticeably);
+    otherwise the process's peak resident set size is reported.
+    """
+    def __init__(self, name=None, track_memory=False):
+        self.name = name
+        self.expanded = 0
+        self.generated = 0
+        self.peak_frontier = 0
+        self.depth_histogram = {}
+        self.counters = {}
+        self.phases = {}
+        self.seconds = None
+        self.peak_memory_bytes = None
+        self.track_memory = track_memory
+        self._started_tracing = False
+        if track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+        self._current_phase = None
+        self._phase_start = self._start = time.perf_counter()
+
+    def expand(self, depth=None, generated=0, frontier=None):
+        """Records one expanded node, how many successors it generated and the frontier size after it."""
+        self.expanded += 1
+        self.generated += generated
+        if depth is not None:
+            self.depth_histogram[depth] = self.depth_histogram.get(depth, 0) + 1
+        if frontier is not None and frontier > self.peak_frontier:
+            self.peak_frontier = frontier
+
+    def add(self, counter, amount=1):
+        """Adds amount to a named counter (flips, conflicts, restarts, ...)."""
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def phase(self, name):
+        """Closes the running phase (if any) and starts timing `name`; repeated names accumulate."""
+        now = time.perf_counter()
+        if self._current_phase is not None:
+            self.phases[self._current_phase] = self.phases.get(self._current_phase, 0.0) + now - self._phase_start
+        self._current_phase = name
+        self._phase_start = now
+
+    def finish(self):
+        """Stops the clock and records the peak memory. Returns self."""
+        self.phase(None)
+        self.seconds = time.perf_counter() - self._start
+        if self.track_memory:
+            self.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+        elif resource is not None:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+            self.peak_memory_bytes = peak if sys.platform == "darwin" else peak * 1024
+        return self
+
+    @property
+    def nodes_per_second(self):
+        elapsed = self.seconds if self.seconds is not None else time.perf_counter() - self._start
+        return self.expanded / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "peak_frontier": self.peak_frontier,
+            "depth_histogram": {str(d): n for d, n in sorted(self.depth_histogram.items())},
+            "counters": self.counters,
+            "phases": self.phases,
+            "seconds": self.seconds,
+            "nodes_per_second": self.nodes_per_second,
+            "peak_memory_bytes": self.peak_memory_bytes,
+        }
+
+    def dump(self, file=None):
+        """Writes the stats as JSON to a path or file object (default: stdout)."""
+        if isinstance(file, str):
+            with open(file, "w") as f:
+                json.dump(self.to_dict(), f, indent=2)
+        else:
+            json.dump(self.to_dict(), file or sys.stdout, indent=2)
+            (file or sys.stdout).write("\n")